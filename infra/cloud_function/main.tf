@@ -14,6 +14,22 @@ data "archive_file" "default" {
     content  = file("${path.module}/../../script/requirements.txt")
     filename = "requirements.txt"
   }
+  dynamic "source" {
+    for_each = fileset("${path.module}/../bigquery/schema", "*_schema.json")
+    content {
+      content  = file("${path.module}/../bigquery/schema/${source.value}")
+      filename = "schema/${source.value}"
+    }
+  }
+  # Offline fallback for generate_location_data, built with
+  # `python script/main.py build-location-cache USA`
+  dynamic "source" {
+    for_each = fileset("${path.module}/../../data", "locations_*.json")
+    content {
+      content  = file("${path.module}/../../data/${source.value}")
+      filename = "data/${source.value}"
+    }
+  }
 }
 
 # data "archive_file" "data" {
@@ -46,7 +62,10 @@ resource "google_storage_bucket" "gcf-data-bucket" {
 }
 
 resource "google_storage_bucket_object" "gcf-source-data-object" {
-  for_each = toset(["products_data.json", "stores_data.json", "suppliers_data.json", "distribution_centers_data.json"])
+  for_each = setunion(
+    toset(["products_data.json", "stores_data.json", "suppliers_data.json", "distribution_centers_data.json"]),
+    fileset("${path.module}/../../data", "locations_*.json"),
+  )
   name     = "data/${each.value}"
   bucket   = google_storage_bucket.gcf-data-bucket.name
   source   = "${path.module}/../../data/${each.value}"
@@ -100,6 +119,12 @@ resource "google_cloudfunctions2_function" "default" {
       # MAX_LOCATIONS    = var.max_locations
       NUM_OF_CUSTOMERS = var.num_of_customers
       START_DATE       = var.start_date
+      OUTPUT_FORMAT    = var.output_format
+      GENERATION_MODE  = var.generation_mode
+      TEXT_MODE        = var.text_mode
+      ORDER_CHUNK_SIZE = var.order_chunk_size
+      SINK             = var.sink
+      PROFILER         = var.profiler
     }
   }
   depends_on = [google_storage_bucket.gcf-data-bucket, google_storage_bucket.gcf-source-bucket]
@@ -44,3 +44,39 @@ variable "start_date" {
   type    = string
   default = "date(2022-01-01)"
 }
+
+variable "output_format" {
+  type        = string
+  description = "File format staged in GCS and loaded into BigQuery: json, json.gz (gzip-compressed NDJSON) or parquet"
+  default     = "json"
+}
+
+variable "generation_mode" {
+  type        = string
+  description = "full regenerates the whole history, incremental appends only the days missing since the last run"
+  default     = "full"
+}
+
+variable "profiler" {
+  type        = string
+  description = "Set to cprofile or pyinstrument to log a profile of every run"
+  default     = ""
+}
+
+variable "sink" {
+  type        = string
+  description = "gcs stages tables in the data bucket before loading them, bigquery loads them directly from the function"
+  default     = "gcs"
+}
+
+variable "order_chunk_size" {
+  type        = number
+  description = "Orders generated and spilled to disk per chunk, 0 generates all orders in memory at once"
+  default     = 0
+}
+
+variable "text_mode" {
+  type        = string
+  description = "faker draws free text from cached Faker sentences, templates uses per case/pet type templates"
+  default     = "faker"
+}
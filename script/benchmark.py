@@ -0,0 +1,795 @@
+"""Offline benchmarks for the Cymbal Pets generator.
+
+Cloud clients are never built (main creates them on first use) and the
+bundled data/*.json files are used as reference data, so this runs without
+credentials or network access.
+
+    python benchmark.py orders --num-orders 1000000
+    python benchmark.py suite --save-baseline baseline.json
+    python benchmark.py suite --baseline baseline.json
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+
+import main
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+def read_reference(file_name: str) -> list:
+    with open(os.path.join(DATA_DIR, f"{file_name}.json")) as f:
+        return json.load(f)
+
+
+def fake_customers(num_of_customers: int) -> list:
+    """Cheap customer rows carrying only the columns the order engines read."""
+    return [
+        {
+            "customer_id": i,
+            "address_city": f"City {i % 500}",
+            "gender": random.choice(["m", "f"]),
+        }
+        for i in range(1, num_of_customers + 1)
+    ]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def orders_loop(num_of_orders: int, customers: list, stores: list) -> list:
+    """The per-Order dataclass loop main() used before the batch engine."""
+    orders = []
+    for order_id, has_customer_id in enumerate(
+        random.choices([True, False], weights=[0.67, 0.33], k=num_of_orders), start=1
+    ):
+        rand_store = random.randint(0, len(stores) - 1)
+        if has_customer_id:
+            rand_cust = random.randint(0, len(customers) - 1)
+            customer_id = customers[rand_cust]["customer_id"]
+            address_city = customers[rand_cust]["address_city"]
+        else:
+            customer_id, address_city = None, None
+        orders.extend(
+            main.generate_orders(
+                customer_id=customer_id,
+                address_city=address_city,
+                store_id=stores[rand_store]["store_id"],
+                order_id=order_id,
+            )
+        )
+    return orders
+
+
+def child_created_at_recursive(parent_date, month_weights=None):
+    """The rejection-sampling DataUtils.child_created_at before the DateSampler."""
+    if month_weights is None:
+        month_weights = main.DataUtils.SEASONAL_WEIGHTS
+    time_between_dates = max((main.date.today() - parent_date).days, 2)
+    random_number_of_days = random.randrange(1, time_between_dates)
+    random_date = parent_date + main.timedelta(days=random_number_of_days)
+    if random.random() > month_weights[random_date.month]:
+        return child_created_at_recursive(parent_date)
+    return random_date
+
+
+def bench_child_dates(args):
+    parent_date = main.CYMBAL_PETS_START_DATE
+    n = args.num_draws
+
+    _, recursive_secs = timed(
+        lambda: [child_created_at_recursive(parent_date) for _ in range(n)]
+    )
+    _, single_secs = timed(
+        lambda: [main.DataUtils.child_created_at(parent_date) for _ in range(n)]
+    )
+    _, batch_secs = timed(main.DataUtils.child_created_at_batch, parent_date, n)
+
+    print(f"recursive: {recursive_secs:>8.3f} s for {n:,} draws")
+    print(f"sampler:   {single_secs:>8.3f} s ({recursive_secs / single_secs:.1f}x)")
+    print(f"batch:     {batch_secs:>8.3f} s ({recursive_secs / batch_secs:.1f}x)")
+
+
+def bench_orders(args):
+    customers = fake_customers(args.num_customers)
+    stores = read_reference("stores_data")
+
+    _, loop_secs = timed(orders_loop, args.loop_sample, customers, stores)
+    loop_rate = args.loop_sample / loop_secs
+
+    columns, batch_secs = timed(
+        main.generate_orders_batch, args.num_orders, customers, stores
+    )
+    _, records_secs = timed(main.DataUtils.columns_to_records, columns)
+    batch_rate = args.num_orders / batch_secs
+
+    print(f"loop:    {loop_rate:>14,.0f} orders/s ({args.loop_sample:,} sampled)")
+    print(f"batch:   {batch_rate:>14,.0f} orders/s ({args.num_orders:,} orders)")
+    print(f"records: {records_secs:>14.2f} s to build row dicts")
+    print(f"speedup: {batch_rate / loop_rate:>14.1f}x")
+
+
+def bench_shards(args):
+    customers = fake_customers(args.num_customers)
+    stores = read_reference("stores_data")
+    products = read_reference("products_data")
+
+    def single():
+        orders = main.generate_orders_batch(args.num_orders, customers, stores)
+        return orders, main.generate_order_items_batch(orders, products, customers)
+
+    _, base_secs = timed(single)
+    print(f"1 process:   {base_secs:>8.2f} s for {args.num_orders:,} orders")
+    for processes in args.processes:
+        (orders, _), secs = timed(
+            main.generate_orders_sharded,
+            args.num_orders,
+            customers,
+            stores,
+            products,
+            processes=processes,
+            seed=args.seed,
+        )
+        assert len(np.unique(orders["order_id"])) == args.num_orders
+        print(f"{processes} processes: {secs:>8.2f} s ({base_secs / secs:.1f}x)")
+
+
+def faker_customer(address_city, address_state):
+    """A customer row built with per-row Faker calls, as before the name pool."""
+    gender = random.choices(["m", "f"], weights=[0.37, 0.63])[0]
+    fake = main.get_faker()
+    first_name = fake.first_name_male() if gender == "m" else fake.first_name_female()
+    last_name = fake.last_name()
+    return {
+        "address_city": address_city,
+        "address_state": address_state,
+        "gender": gender,
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"{first_name.lower()}{last_name.lower()}@{fake.safe_domain_name()}",
+        "loyalty_member": random.choices([True, False], weights=[0.31, 0.69])[0],
+    }
+
+
+def fake_geo_data(num_states: int = 50, cities_per_state: int = 400) -> dict:
+    return {
+        "states": [
+            {
+                "name": f"State {s}",
+                "type": "state",
+                "cities": [
+                    {"name": f"City {s}-{c}", "latitude": "40.0", "longitude": "-75.0"}
+                    for c in range(cities_per_state)
+                ],
+            }
+            for s in range(num_states)
+        ]
+    }
+
+
+def bench_customers(args):
+    geo_index = main.GeoIndex(fake_geo_data())
+
+    _, loop_secs = timed(
+        lambda: [faker_customer("City", "State") for _ in range(args.loop_sample)]
+    )
+    _, pool_secs = timed(main.get_name_pool)
+    columns, batch_secs = timed(
+        main.generate_customers_batch, args.num_customers, None, geo_index
+    )
+    _, records_secs = timed(main.DataUtils.columns_to_records, columns)
+
+    loop_rate = args.loop_sample / loop_secs
+    print(f"faker loop: {loop_rate:>12,.0f} customers/s ({args.loop_sample:,} sampled)")
+    print(f"name pool:  {pool_secs:>12.2f} s to build (once per instance)")
+    print(f"batch:      {batch_secs:>12.2f} s for {args.num_customers:,} customers")
+    print(f"records:    {records_secs:>12.2f} s to build row dicts")
+    print(f"loop would take {args.num_customers / loop_rate:,.0f} s")
+
+
+def traced_bytes(fn, *args, **kwargs):
+    """Bytes still allocated by what `fn` returns, measured with tracemalloc."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = fn(*args, **kwargs)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return result, retained
+
+
+def bench_memory(args):
+    customers = fake_customers(args.num_customers)
+    stores = read_reference("stores_data")
+    products = read_reference("products_data")
+    n = args.num_orders
+
+    records, loop_bytes = traced_bytes(orders_loop, args.loop_sample, customers, stores)
+    del records
+    table, table_bytes = traced_bytes(main.generate_orders_batch, n, customers, stores)
+    _, item_records_bytes = traced_bytes(
+        lambda: main.DataUtils.columns_to_records(
+            main.generate_order_items_batch(table, products, customers)
+        )
+    )
+    items, item_table_bytes = traced_bytes(
+        main.generate_order_items_batch, table, products, customers
+    )
+
+    print(f"orders, dataclass dicts: {loop_bytes / args.loop_sample:>8.0f} bytes/order")
+    print(
+        f"orders, ColumnTable:     {table_bytes / n:>8.0f} bytes/order "
+        f"({table.nbytes / n:.0f} in column buffers)"
+    )
+    print(f"items, row dicts:        {item_records_bytes / items.num_rows:>8.0f} bytes/item")
+    print(f"items, ColumnTable:      {item_table_bytes / items.num_rows:>8.0f} bytes/item")
+    print(f"{n:,} orders would need {loop_bytes / args.loop_sample * n / 2**30:.2f} GiB as dicts")
+
+
+class FakeLoadJob:
+    errors = None
+
+    def __init__(self, output_rows: int):
+        self.output_rows = output_rows
+
+    def done(self) -> bool:
+        return True
+
+    def result(self):
+        return self
+
+
+class DelayedLoadJob(FakeLoadJob):
+    """A load job that reports done `seconds` after it was started."""
+
+    def __init__(self, output_rows: int, seconds: float):
+        super().__init__(output_rows)
+        self.ready = time.perf_counter() + seconds
+
+    def done(self) -> bool:
+        return time.perf_counter() >= self.ready
+
+
+class SlowSink(main.LocalSink):
+    """LocalSink that takes as long as uploading at `bandwidth` bytes/s would,
+    and whose load jobs take `load_seconds`."""
+
+    def __init__(self, directory: str, bandwidth: float, load_seconds: float):
+        super().__init__(directory)
+        self.bandwidth = bandwidth
+        self.load_seconds = load_seconds
+
+    def stage(self, data_name, data_list, *args, **kwargs):
+        staged, num_bytes, raw_bytes = super().stage(data_name, data_list, *args, **kwargs)
+        time.sleep(num_bytes / self.bandwidth)
+        return staged, num_bytes, raw_bytes
+
+    def load(self, data_name, staged, *args, **kwargs):
+        return DelayedLoadJob(super().load(data_name, staged).output_rows, self.load_seconds)
+
+
+class PhasedPipeline(main.ExportPipeline):
+    """ExportPipeline holding every table until close(), i.e. main() as it ran
+    before the pipeline: generate everything, then export everything."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.held = []
+
+    def submit(self, name, data):
+        self.held.append((name, data))
+
+    def close(self, abort: bool = False) -> list:
+        if not abort and not self.closed:
+            for name, data in self.held:
+                super().submit(name, data)
+        return super().close(abort)
+
+
+class FakeBigQueryClient:
+    """In-process stand-in for bigquery.Client that counts loaded rows.
+
+    load_table_from_file reads the whole upload like BigQuery would, so the
+    direct-load sink can be benchmarked end to end without credentials.
+    """
+
+    def __init__(self):
+        self.loaded = {}
+
+    def dataset(self, dataset_id: str):
+        from google.cloud import bigquery
+
+        return bigquery.DatasetReference("fake-project", dataset_id)
+
+    def load_table_from_file(self, file_obj, table_ref, job_config=None, rewind=False, job_id=None):
+        if rewind:
+            file_obj.seek(0)
+        content = file_obj.read()
+        if job_config.source_format == "PARQUET":
+            import pyarrow.parquet as pq
+
+            rows = pq.read_metadata(io.BytesIO(content)).num_rows
+        else:
+            rows = content.count(b"\n")
+        self.loaded[table_ref.table_id] = (rows, len(content))
+        return FakeLoadJob(rows)
+
+    def load_table_from_uri(self, uri, table_ref, job_config=None, job_id=None):
+        return FakeLoadJob(0)
+
+
+def bench_export(args):
+    customers = fake_customers(args.num_customers)
+    stores = read_reference("stores_data")
+    products = read_reference("products_data")
+    orders = main.generate_orders_batch(args.num_orders, customers, stores)
+    data_list = {
+        "orders": orders,
+        "order_items": main.generate_order_items_batch(orders, products, customers),
+        "products": products,
+    }
+    main.LOAD_POLL_INTERVAL = 0.01
+
+    with tempfile.TemporaryDirectory() as directory:
+        for output_format in args.formats:
+            sinks = {
+                "local": main.LocalSink(directory),
+                "bigquery": main.BigQuerySink("fake_dataset", client=FakeBigQueryClient()),
+            }
+            for name, sink in sinks.items():
+                _, secs = timed(
+                    main.export_tables, data_list, sink, output_format=output_format
+                )
+                rows = sum(main.DataUtils.num_rows(data) for data in data_list.values())
+                print(f"{name:>8} {output_format:>7}: {secs:>6.2f} s ({rows / secs:,.0f} rows/s)")
+
+
+def bench_compression(args):
+    """Size and time of json vs json.gz exports of orders and order items.
+
+    Tables are written with LocalSink. The saving is in the upload, so the
+    transfer time is projected at --bandwidth MB/s on top of the measured
+    serialization (and compression) time.
+    """
+    customers = fake_customers(args.num_customers)
+    orders = main.generate_orders_batch(args.num_orders, customers, read_reference("stores_data"))
+    data_list = {
+        "orders": orders,
+        "order_items": main.generate_order_items_batch(
+            orders, read_reference("products_data"), customers
+        ),
+    }
+    bandwidth = args.bandwidth * 1e6
+    print(
+        f"{'table':<12} {'json MB':>8} {'gz MB':>7} {'ratio':>6} {'json s':>7} "
+        f"{'gz s':>6} {'json+up s':>9} {'gz+up s':>8} {'saved s':>8}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        sink = main.LocalSink(directory)
+        for name, table in data_list.items():
+            (_, json_bytes, _), json_secs = timed(sink.export, name, table, "json")
+            (_, gz_bytes, _), gz_secs = timed(sink.export, name, table, "json.gz")
+            json_total = json_secs + json_bytes / bandwidth
+            gz_total = gz_secs + gz_bytes / bandwidth
+            print(
+                f"{name:<12} {json_bytes / 1e6:>8.1f} {gz_bytes / 1e6:>7.1f} "
+                f"{json_bytes / gz_bytes:>5.1f}x {json_secs:>7.2f} {gz_secs:>6.2f} "
+                f"{json_total:>9.2f} {gz_total:>8.2f} {json_total - gz_total:>8.2f}"
+            )
+
+
+def bench_pipeline(args):
+    """main() with exports held until generation ends vs pipelined exports."""
+    main.LOAD_POLL_INTERVAL = 0.05
+    config = main.Config(
+        args.num_customers, args.daily_orders, order_chunk_size=args.chunk_size
+    )
+    patches = offline_reference_data()
+    for patch in patches:
+        patch.start()
+    try:
+        # Warm up the name pool and sentence bank caches outside the timings
+        with mock.patch("builtins.print"):
+            run_main(100, 1)
+        results = {}
+        for name, pipeline in (("phased", PhasedPipeline), ("pipelined", main.ExportPipeline)):
+            with tempfile.TemporaryDirectory() as directory, mock.patch.object(
+                main, "ExportPipeline", pipeline
+            ), mock.patch("builtins.print"):
+                sink = SlowSink(directory, args.bandwidth * 1e6, args.load_seconds)
+                summary, secs = timed(
+                    main.main,
+                    args.num_customers,
+                    args.daily_orders,
+                    mode="full",
+                    sink=sink,
+                    config=config,
+                )
+            export = next(s["wall_seconds"] for s in summary["stages"] if s["stage"] == "export")
+            results[name] = secs
+            print(
+                f"{name:>9}: {secs:>6.2f} s total, {secs - export:>6.2f} s generating, "
+                f"{export:>6.2f} s waiting for exports"
+            )
+    finally:
+        for patch in patches:
+            patch.stop()
+    print(f"speedup: {results['phased'] / results['pipelined']:.2f}x")
+
+
+def offline_reference_data():
+    """Patches main to read reference and location data without any bucket."""
+    return [
+        mock.patch.object(
+            main.DataHandling,
+            "read_json",
+            lambda bucket_name, file_name, city_name=None: read_reference(file_name),
+        ),
+        mock.patch.object(
+            main, "generate_location_data", lambda country_iso3, **kwargs: fake_geo_data()
+        ),
+    ]
+
+
+def measure(fn, *args, memory: bool = True):
+    """Seconds for one call of `fn`, and its peak traced memory in bytes.
+
+    The peak comes from a second, tracemalloc-traced call so that tracing
+    does not slow down the timed one.
+    """
+    result, secs = timed(fn, *args)
+    peak = None
+    if memory:
+        del result
+        tracemalloc.start()
+        result = fn(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, secs, peak
+
+
+def run_main(num_of_customers: int, daily_orders: int) -> int:
+    """Runs main() into a temporary LocalSink and returns the rows it exported."""
+    with tempfile.TemporaryDirectory() as directory:
+        summary = main.main(
+            num_of_customers, daily_orders, mode="full", sink=main.LocalSink(directory)
+        )
+    return sum(table["rows"] for table in summary["tables"])
+
+
+def suite_cases(args):
+    """Yields (case name, function, its arguments, rows per call) per scale.
+
+    Rows are None where they are only known from the result.
+    """
+    stores = read_reference("stores_data")
+    products = read_reference("products_data")
+    suppliers = read_reference("suppliers_data")
+    distribution_centers = read_reference("distribution_centers_data")
+    geo_data = fake_geo_data()
+    geo_index = main.GeoIndex(geo_data)
+
+    for scale in args.scales:
+        customers = main.generate_customers_batch(scale, geo_data, geo_index)
+        orders = main.DataUtils.columns_to_records(
+            main.generate_orders_batch(scale, customers, stores)
+        )
+        yield f"generate_customers[{scale}]", main.generate_customers, (
+            scale, geo_data, geo_index
+        ), scale
+        yield f"generate_order_items[{scale} orders]", main.generate_order_items, (
+            orders, products, customers
+        ), None
+        yield f"generate_purchase_order_data[{scale}]", main.generate_purchase_order_data, (
+            scale, products, suppliers, distribution_centers
+        ), scale
+        yield f"generate_pet_profiles[{scale}]", main.generate_pet_profiles, (
+            customers, scale
+        ), scale
+        yield f"generate_customer_service[{scale}]", main.generate_customer_service, (
+            customers, scale
+        ), scale
+        yield f"generate_employees[{min(scale, args.max_employees)}]", main.generate_employees, (
+            min(scale, args.max_employees),
+        ), min(scale, args.max_employees)
+        del customers, orders
+
+    for scale in args.main_scales:
+        num_of_customers, daily_orders = (int(v) for v in scale.split(":"))
+        yield f"main[{num_of_customers} customers, {daily_orders}/day]", run_main, (
+            num_of_customers, daily_orders
+        ), None
+
+
+def compare_to_baseline(
+    results: dict, baseline: dict, tolerance: float, min_seconds: float = 0.05
+) -> list:
+    """Cases that are slower, or use more memory, than the baseline by > tolerance.
+
+    Cases that took under `min_seconds` in the baseline are too noisy to compare.
+    """
+    regressions = []
+    for case, result in results.items():
+        before = baseline.get(case)
+        if before is None or before["seconds"] < min_seconds:
+            continue
+        if result["rows_per_sec"] < before["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{case}: {result['rows_per_sec']:,.0f} rows/s vs {before['rows_per_sec']:,.0f}"
+            )
+        if (
+            result.get("peak_mb") is not None
+            and before.get("peak_mb") is not None
+            and result["peak_mb"] > before["peak_mb"] * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{case}: peak {result['peak_mb']:,.1f} MiB vs {before['peak_mb']:,.1f}"
+            )
+    return regressions
+
+
+def bench_suite(args):
+    patches = offline_reference_data()
+    for patch in patches:
+        patch.start()
+    results = {}
+    try:
+        with mock.patch("builtins.print"):
+            cases = list(suite_cases(args))
+        print(f"{'case':<52} {'rows':>10} {'seconds':>9} {'rows/s':>12} {'peak MiB':>9}")
+        for case, fn, fn_args, rows in cases:
+            with mock.patch("builtins.print"):
+                result, secs, peak = measure(fn, *fn_args, memory=not args.no_memory)
+            if rows is None:
+                rows = result if isinstance(result, int) else main.DataUtils.num_rows(result)
+            results[case] = {
+                "rows": rows,
+                "seconds": secs,
+                "rows_per_sec": rows / secs,
+                "peak_mb": peak / 2**20 if peak is not None else None,
+            }
+            peak_text = f"{peak / 2**20:>9.1f}" if peak is not None else f"{'-':>9}"
+            print(f"{case:<52} {rows:>10,} {secs:>9.2f} {rows / secs:>12,.0f} {peak_text}")
+            del result
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(
+                results, json.load(f), args.tolerance, args.min_seconds
+            )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+IMPORTS_BEFORE_LAZY_LOADING = (
+    "import numpy, requests, faker, google.cloud.bigquery, google.cloud.storage; faker.Faker()"
+)
+
+
+def import_time(statement: str) -> tuple:
+    """Wall seconds to run `statement` in a fresh interpreter, and its -X importtime
+    report as (cumulative microseconds, package) for the top-level imports."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        if not package.startswith("  "):
+            top_level.append((int(cumulative), package.strip()))
+    return wall, top_level
+
+
+def bench_importtime(args):
+    results = {
+        "eager (before)": import_time(IMPORTS_BEFORE_LAZY_LOADING),
+        "import main": import_time("import main"),
+    }
+    for name, (wall, top_level) in results.items():
+        total = sum(us for us, _ in top_level) / 1e6
+        heaviest = sorted(top_level, reverse=True)[: args.top]
+        print(f"{name}: {total:.3f} s imports, {wall:.3f} s interpreter wall")
+        for us, package in heaviest:
+            print(f"    {us / 1e6:>7.3f} s  {package}")
+    print(
+        "The eager line excludes building the BigQuery and Storage clients, which "
+        "main used to do at import and which needs credentials."
+    )
+
+
+def bench_reference(args):
+    """Startup reference loading one input at a time vs all at once.
+
+    Reads data/*.json through the local backend; every read and the location
+    data lookup sleep `--latency` seconds first to stand in for a download.
+    """
+
+    def slow(fn):
+        def wrapper(*a, **kw):
+            time.sleep(args.latency)
+            return fn(*a, **kw)
+
+        return wrapper
+
+    patches = [
+        mock.patch.object(main.ReferenceData, "read", slow(main.ReferenceData.read)),
+        mock.patch.object(
+            main,
+            "generate_location_data",
+            slow(lambda country_iso3, **kwargs: fake_geo_data()),
+        ),
+    ]
+    names = main.REFERENCE_FILES + ("location_data",)
+
+    def load(max_workers):
+        reference = main.ReferenceData(source="local", max_workers=max_workers)
+        return [reference.get(name) for name in names]
+
+    for patch in patches:
+        patch.start()
+    try:
+        _, sequential = timed(load, 1)
+        _, concurrent = timed(load, None)
+    finally:
+        for patch in patches:
+            patch.stop()
+    print(f"{len(names)} inputs, {args.latency:.2f} s simulated latency each")
+    print(f"one at a time: {sequential:>6.2f} s")
+    print(f"concurrent:    {concurrent:>6.2f} s ({sequential / concurrent:.1f}x)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    orders = sub.add_parser("orders", help="per-Order loop vs batch order engine")
+    orders.add_argument("--num-orders", type=int, default=1_000_000)
+    orders.add_argument(
+        "--loop-sample",
+        type=int,
+        default=20_000,
+        help="orders to time the per-Order loop on; its rate is extrapolated",
+    )
+    orders.add_argument("--num-customers", type=int, default=100_000)
+    orders.set_defaults(run=bench_orders)
+
+    child_dates = sub.add_parser(
+        "child-dates", help="recursive vs sampled DataUtils.child_created_at"
+    )
+    child_dates.add_argument("--num-draws", type=int, default=100_000)
+    child_dates.set_defaults(run=bench_child_dates)
+
+    customers = sub.add_parser(
+        "customers", help="per-row Faker customers vs the name pool batch"
+    )
+    customers.add_argument("--num-customers", type=int, default=1_000_000)
+    customers.add_argument("--loop-sample", type=int, default=20_000)
+    customers.set_defaults(run=bench_customers)
+
+    shards = sub.add_parser("shards", help="single-process vs sharded order generation")
+    shards.add_argument("--num-orders", type=int, default=4_000_000)
+    shards.add_argument("--num-customers", type=int, default=100_000)
+    shards.add_argument("--processes", type=int, nargs="+", default=[2, 4])
+    shards.add_argument("--seed", type=int, default=None)
+    shards.set_defaults(run=bench_shards)
+
+    memory = sub.add_parser(
+        "memory", help="bytes per order as dataclass dicts vs a ColumnTable"
+    )
+    memory.add_argument("--num-orders", type=int, default=1_000_000)
+    memory.add_argument("--loop-sample", type=int, default=50_000)
+    memory.add_argument("--num-customers", type=int, default=100_000)
+    memory.set_defaults(run=bench_memory)
+
+    export = sub.add_parser("export", help="export_tables through the local and direct-load sinks")
+    export.add_argument("--num-orders", type=int, default=500_000)
+    export.add_argument("--num-customers", type=int, default=100_000)
+    export.add_argument("--formats", nargs="+", default=["json", "json.gz", "parquet"])
+    export.set_defaults(run=bench_export)
+
+    suite = sub.add_parser(
+        "suite", help="every generate_* function and main() at several scales"
+    )
+    suite.add_argument("--scales", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    suite.add_argument(
+        "--main-scales",
+        nargs="*",
+        default=["1000:10", "100000:100", "1000000:1000"],
+        help="NUM_OF_CUSTOMERS:DAILY_ORDERS pairs to run main() at",
+    )
+    suite.add_argument(
+        "--max-employees",
+        type=int,
+        default=100_000,
+        help="cap on generate_employees rows, it is still a per-row loop",
+    )
+    suite.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    suite.add_argument("--save-baseline", help="write the results to this JSON file")
+    suite.add_argument("--baseline", help="compare against results saved with --save-baseline")
+    suite.add_argument("--tolerance", type=float, default=0.2)
+    suite.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="ignore cases faster than this in the baseline when comparing",
+    )
+    suite.set_defaults(run=bench_suite)
+
+    compression = sub.add_parser("compression", help="json vs json.gz export size and time")
+    compression.add_argument("--num-orders", type=int, default=500_000)
+    compression.add_argument("--num-customers", type=int, default=100_000)
+    compression.add_argument(
+        "--bandwidth", type=float, default=50.0, help="projected upload bandwidth, MB/s"
+    )
+    compression.set_defaults(run=bench_compression)
+
+    pipeline = sub.add_parser(
+        "pipeline", help="main() exporting after generation vs while generating"
+    )
+    pipeline.add_argument("--num-customers", type=int, default=20_000)
+    pipeline.add_argument("--daily-orders", type=int, default=200)
+    pipeline.add_argument(
+        "--bandwidth", type=float, default=20.0, help="simulated upload bandwidth, MB/s"
+    )
+    pipeline.add_argument(
+        "--load-seconds", type=float, default=3.0, help="simulated BigQuery load job duration"
+    )
+    pipeline.add_argument(
+        "--chunk-size",
+        type=int,
+        default=main.ORDER_CHUNK_SIZE,
+        help="Config.order_chunk_size; chunked orders are exported while they are generated",
+    )
+    pipeline.set_defaults(run=bench_pipeline)
+
+    importtime = sub.add_parser(
+        "importtime", help="python -X importtime of main vs the eager imports it replaced"
+    )
+    importtime.add_argument("--top", type=int, default=5)
+    importtime.set_defaults(run=bench_importtime)
+
+    reference = sub.add_parser(
+        "reference", help="sequential vs concurrent reference data loading, offline"
+    )
+    reference.add_argument(
+        "--latency", type=float, default=0.3, help="simulated seconds per download"
+    )
+    reference.set_defaults(run=bench_reference)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.run(args)
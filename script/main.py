@@ -1,36 +1,84 @@
 # Location info sources from: https://github.com/dr5hn/countries-states-cities-database
 
-import json, random, typing, itertools, os
+import io, json, random, typing, itertools, os, functools, time, string, tempfile, shutil
+import contextlib
+import gzip
+import queue
+import resource
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from dataclasses import dataclass, field, InitVar
-from decimal import Decimal
+from dataclasses import dataclass, field
 from itertools import repeat
 import numpy as np
-import requests
 import random
 import math
 
-from google.cloud import bigquery, storage
-from faker import Faker
+if typing.TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
 # ==== INITIALIZATION ============================
-fake = Faker()
-bq_client = bigquery.Client()
-storage_client = storage.Client()
+# google.cloud, faker and requests are imported, and the clients and Faker
+# built, on first use, so importing this module stays cheap and needs no
+# credentials. numpy is imported eagerly: the samplers, dataclass defaults and
+# annotations below use it at import time and every run needs it anyway.
+np_rng = np.random.default_rng()
+
+
+@functools.lru_cache(maxsize=None)
+def get_faker():
+    from faker import Faker
+
+    return Faker()
+
+
+@functools.lru_cache(maxsize=None)
+def get_bq_client():
+    from google.cloud import bigquery
+
+    return bigquery.Client()
+
+
+@functools.lru_cache(maxsize=None)
+def get_storage_client():
+    from google.cloud import storage
+
+    return storage.Client()
+
+
 # ================================================
 
-# TODO: these should be env variables
-# BUCKET_NAME = "4711_test_cymbal_pets"
-# DAILY_ORDERS = 2
-# NUM_OF_CUSTOMERS = 100
 CYMBAL_PETS_START_DATE = date(2023, 1, 1)
-DATASET_ID = os.getenv("DATASET_ID")
-BUCKET_NAME = os.getenv("BUCKET_NAME")
-DAILY_ORDERS = int(os.getenv("DAILY_ORDERS"))
-# MIN_LOCATIONS = int(os.getenv("MIN_LOCATIONS"))
-# MAX_LOCATIONS = int(os.getenv("MAX_LOCATIONS"))
-NUM_OF_CUSTOMERS = int(os.getenv("NUM_OF_CUSTOMERS"))
-# CYMBAL_PETS_START_DATE = int(os.getenv("START_DATE"))
+# Defaults of the settings Config.from_env reads from the environment
+OUTPUT_FORMAT = "json"
+GENERATION_MODE = "full"
+TEXT_MODE = "faker"
+SCHEMA_DIR = next(
+    (
+        path
+        for path in (
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema"),
+            os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "..", "infra", "bigquery", "schema"
+            ),
+        )
+        if os.path.isdir(path)
+    ),
+    None,
+)
+LOCAL_DATA_DIR = next(
+    (
+        path
+        for path in (
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"),
+        )
+        if os.path.isdir(path)
+    ),
+    None,
+)
 # ================================================
 
 CATEGORY_WEIGHTS = {
@@ -55,11 +103,276 @@ CUSTOMER_SEGMENTS = {
     },
 }
 
+GENDER_WEIGHTS = {"m": 0.37, "f": 0.63}
+
+LOYALTY_WEIGHTS = {True: 0.31, False: 0.69}
+
+CUSTOMER_ORDER_WEIGHTS = {True: 0.67, False: 0.33}
+
+# Days from purchase order to delivery, and units per purchase order
+DELIVERY_DAYS_WEIGHTS = {
+    1: 0.06, 2: 0.09, 3: 0.11, 4: 0.13, 5: 0.15, 6: 0.16, 7: 0.12, 8: 0.10, 9: 0.05, 10: 0.03,
+}
+PURCHASE_QUANTITY_WEIGHTS = {
+    100: 0.08, 500: 0.14, 750: 0.21, 1000: 0.29, 3000: 0.16, 6000: 0.08, 10000: 0.04,
+}
+
+CASE_TYPE_WEIGHTS = {
+    "Return": 0.1,
+    "Complaint": 0.5,
+    "Product Question": 0.25,
+    "Payment Issue": 0.15,
+}
+
+CASE_STATUS_WEIGHTS = {"Open": 0.45, "In Progress": 0.15, "Closed": 0.45, "Escalated": 0.05}
+
+PET_TYPE_WEIGHTS = {
+    "Cat": 0.3,
+    "Dog": 0.25,
+    "Fish": 0.14,
+    "Bird": 0.09,
+    "Reptile": 0.06,
+    "Other": 0.16,
+}
+
+ACTIVITY_LEVELS = ["Low", "Medium", "High"]
+
+# Domain-specific free text per case_type/pet_type, used with TEXT_MODE=templates.
+# Every combination of the {slot} words below is expanded into the sentence bank.
+TEXT_TEMPLATES = {
+    "Return": [
+        "Customer returned the {product} because it {return_reason}.",
+        "Refund issued for the {product} that {return_reason}.",
+    ],
+    "Complaint": [
+        "Customer complained that the {product} {complaint}.",
+        "Apologized and offered store credit, the {product} {complaint}.",
+    ],
+    "Product Question": [
+        "Answered whether the {product} {question}.",
+        "Customer asked if the {product} {question}.",
+    ],
+    "Payment Issue": [
+        "{payment} payment {payment_issue}, resolved with the customer.",
+        "Customer reported that a {payment} payment {payment_issue}.",
+    ],
+    "Cat": ["Needs {diet} food, {cat_note}.", "Prefers {diet} meals and {cat_note}."],
+    "Dog": ["Needs {diet} food, {dog_note}.", "Prefers {diet} meals and {dog_note}."],
+    "Fish": ["Feed {fish_food} {frequency}, avoid overfeeding."],
+    "Bird": ["Seed mix with {bird_extra}, fed {frequency}."],
+    "Reptile": ["Feed {reptile_food} {frequency}, add calcium supplements."],
+    "Other": ["Needs {diet} food, fed {frequency}."],
+}
+TEMPLATE_WORDS = {
+    "product": ["cat food", "dog food", "toy", "leash", "collar", "pet bed", "litter box", "aquarium filter", "bird cage", "chew treats"],
+    "return_reason": ["arrived damaged", "was the wrong size", "was not as described", "was no longer needed", "arrived after the due date"],
+    "complaint": ["broke after a week", "arrived late", "was missing parts", "did not match the picture", "was out of stock in store"],
+    "question": ["is suitable for puppies", "is machine washable", "contains grain", "comes in other colors", "is safe for small pets"],
+    "payment": ["Credit Card", "Paypal", "Invoice", "Cash"],
+    "payment_issue": ["was charged twice", "was declined", "was not refunded", "was charged the wrong amount"],
+    "diet": ["grain-free", "low-fat", "high-protein", "senior", "sensitive stomach", "weight management"],
+    "cat_note": ["drinks little water", "is allergic to chicken", "likes wet food", "needs hairball control"],
+    "dog_note": ["is allergic to beef", "needs joint support", "eats fast", "is on a diet"],
+    "fish_food": ["flakes", "pellets", "frozen brine shrimp", "bloodworms"],
+    "bird_extra": ["fresh fruit", "greens", "pellets", "millet sprays"],
+    "reptile_food": ["crickets", "mealworms", "leafy greens", "frozen mice"],
+    "frequency": ["once a day", "twice a day", "every other day", "three times a week"],
+}
+
+ORDER_TYPE_WEIGHTS = {"Online": 0.61, "Offline": 0.39}
+
+PAYMENT_METHOD_WEIGHTS = {
+    "Offline": {"Cash": 0.35, "Credit Card": 0.65},
+    "Online": {"Credit Card": 0.41, "Paypal": 0.33, "Invoice": 0.26},
+}
+
+# Child table -> {foreign key column: (parent table, parent key column)},
+# checked by validate_tables before anything is exported
+FOREIGN_KEYS = {
+    "orders": {"customer_id": ("customers", "customer_id"), "store_id": ("stores", "store_id")},
+    "order_items": {"order_id": ("orders", "order_id"), "product_id": ("products", "product_id")},
+    "purchase_orders": {
+        "supplier_id": ("suppliers", "supplier_id"),
+        "product_id": ("products", "product_id"),
+        "distribution_center_id": ("distribution_centers", "distribution_center_id"),
+    },
+    "pet_profiles": {"customer_id": ("customers", "customer_id")},
+    "customer_service": {"customer_id": ("customers", "customer_id")},
+}
+
+# Records serialized per write, and bytes per resumable upload request
+# (must be a multiple of 256 KiB)
+NDJSON_CHUNK_RECORDS = 10_000
+UPLOAD_CHUNK_SIZE = 32 * 256 * 1024
+PARQUET_ROW_GROUP_SIZE = 250_000
+
+# Tables uploaded concurrently, generated tables allowed to wait for an
+# exporter before generation blocks, and seconds between load job polls
+EXPORT_WORKERS = 6
+EXPORT_QUEUE_TABLES = 2
+LOAD_POLL_INTERVAL = 1.0
+
+# Faker draws per name pool (first names per gender, last names) and domains
+NAME_POOL_SIZE = 5_000
+DOMAIN_POOL_SIZE = 100
+
+# Faker sentences in the sentence bank, how free text is generated ("faker"
+# sentences or domain "templates"), and where the bank is cached
+SENTENCE_BANK_SIZE = 20_000
+SENTENCE_BANK_FILE = "sentence_bank.json"
+SENTENCE_BANK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "cymbal_pets")
+
+# Reference files in the data/ folder, and where ReferenceData reads them from:
+# "bucket" (the data bucket) or "local" (LOCAL_DATA_DIR, for offline runs)
+REFERENCE_FILES = ("products_data", "stores_data", "suppliers_data", "distribution_centers_data")
+REFERENCE_SOURCE = "bucket"
+REFERENCE_SOURCES = ("bucket", "local")
+
+# Manifest object recording what has been generated so far
+MANIFEST_FILE = "manifest.json"
+
+# First ID of a table that has no high-water mark yet (default 1)
+ID_START = {"employees": 100}
+
+# Worker processes for order generation (1 keeps it in-process), and an
+# optional seed making sharded runs reproducible
+GENERATION_PROCESSES = 1
+GENERATION_SEED = None
+
+# Orders generated per chunk in the chunked pipeline (0 generates all orders at
+# once), and where chunks are spilled as Parquet part files. On Cloud Functions
+# /tmp is memory-backed, but compressed parts are far smaller than the columns.
+ORDER_CHUNK_SIZE = 0
+SPILL_DIR = tempfile.gettempdir()
+
+# Where tables are exported to: "gcs" stages files in the bucket and loads them
+# from there, "bigquery" loads them straight from a local buffer, and "local"
+# only writes files to LOCAL_SINK_DIR. Direct loads are buffered in memory up
+# to SPOOL_MAX_BYTES and on disk beyond that.
+SINK = "gcs"
+SINKS = ("gcs", "bigquery", "local")
+LOCAL_SINK_DIR = "output"
+SPOOL_MAX_BYTES = 256 * 1024 * 1024
+
+# Profile each run with "cprofile" or "pyinstrument" (unset: no profiling)
+PROFILER = None
+PROFILERS = ("cprofile", "pyinstrument")
+
+# File extension and BigQuery source format per OUTPUT_FORMAT
+# (BigQuery enum values are spelled out so google.cloud is only imported once a
+# load job is built)
+OUTPUT_FORMATS = {
+    "json": ("json", "NEWLINE_DELIMITED_JSON"),
+    "json.gz": ("json.gz", "NEWLINE_DELIMITED_JSON"),
+    "parquet": ("parquet", "PARQUET"),
+}
+# zlib level of json.gz exports, and serialized chunks queued for compression
+# or upload on a background thread
+GZIP_LEVEL = 1
+STREAM_QUEUE_CHUNKS = 4
+WRITE_TRUNCATE = "WRITE_TRUNCATE"
+WRITE_APPEND = "WRITE_APPEND"
+
+
+class CountingStream(io.BufferedIOBase):
+    """Write-only wrapper around a binary stream that counts the bytes written."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.raw.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+class QueuedStream(io.BufferedIOBase):
+    """Write-only stream that writes into `raw` on a background thread.
+
+    Writes are handed to the thread through a bounded queue, so the caller
+    keeps serializing while earlier chunks are written out (for a GCS blob,
+    uploaded). close() waits for the queue to drain but leaves `raw` open.
+    """
+
+    def __init__(self, raw, max_chunks: int = STREAM_QUEUE_CHUNKS, name: str = "writer"):
+        self.raw = raw
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.error = None
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.thread = threading.Thread(target=self.drain, name=name, daemon=True)
+        self.thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.error is not None:
+            raise self.error
+        self.chunks.put(bytes(data))
+        self.bytes_in += len(data)
+        return len(data)
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def finish(self) -> bytes:
+        return b""
+
+    def drain(self):
+        while (data := self.chunks.get()) is not None:
+            if self.error is None:
+                try:
+                    self.emit(self.encode(data))
+                except Exception as e:
+                    # Keep draining so the writer never blocks on a full queue
+                    self.error = e
+        if self.error is None:
+            try:
+                self.emit(self.finish())
+            except Exception as e:
+                self.error = e
+
+    def emit(self, data: bytes):
+        if data:
+            self.raw.write(data)
+            self.bytes_out += len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self.chunks.put(None)
+        self.thread.join()
+        super().close()
+        if self.error is not None:
+            raise self.error
+
+
+class GzipStream(QueuedStream):
+    """QueuedStream that gzip-compresses on its thread (zlib releases the GIL)."""
+
+    def __init__(self, raw, level: int = GZIP_LEVEL, max_chunks: int = STREAM_QUEUE_CHUNKS):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        super().__init__(raw, max_chunks, name="gzip")
+
+    def encode(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
 
 class DataHandling:
     @staticmethod
     def read_json(bucket_name: str, file_name: str, city_name: str = None) -> dict:
-        bucket = storage_client.bucket(bucket_name)
+        bucket = get_storage_client().bucket(bucket_name)
         file = f"data/{file_name}.json"
         blob = bucket.blob(file)
 
@@ -90,48 +403,915 @@ class DataHandling:
             return obj.isoformat()  # Convert datetime/date to ISO format string
         raise TypeError(f"Type {type(obj).__name__} not serializable")
 
-    def json_to_gcs(bucket_name, file_name, data_list):
-        """Saves a Python list as a JSON file to Google Cloud Storage (GCS).
+    def write_ndjson(stream, data_list, chunk_records: int = NDJSON_CHUNK_RECORDS) -> int:
+        """Writes records as newline-delimited JSON to a file-like object.
+
+        Records are pulled from the iterable and serialized `chunk_records` at a
+        time, so only one chunk of JSON text is held in memory.
+
+        Args:
+            stream: Text file-like object to write to.
+            data_list (iterable): The records (dicts) or a dict of column arrays
+                to be converted to JSON.
+            chunk_records (int): Number of records serialized per write.
+
+        Returns:
+            int: Number of records written.
+        """
+        records = iter(DataUtils.as_records(data_list))
+        written = 0
+        while chunk := list(itertools.islice(records, chunk_records)):
+            stream.write(
+                "".join(
+                    json.dumps(record, default=DataHandling.serialize) + "\n"
+                    for record in chunk
+                )
+            )
+            written += len(chunk)
+        return written
+
+    def json_to_gcs(
+        bucket_name, file_name, data_list, output_format="json", gzip_level=GZIP_LEVEL
+    ):
+        """Saves records as a newline-delimited JSON file to Google Cloud Storage (GCS).
+
+        The upload is streamed as a chunked resumable upload, so memory stays
+        bounded regardless of the number of records.
 
         Args:
             bucket_name (str): The name of your GCS bucket.
             file_name (str): The name of the JSON file to be saved.
-            data_list (list): The Python list to be converted to JSON.
+            data_list (iterable): The records to be converted to JSON.
+            output_format (str): "json", or "json.gz" to upload it gzip-compressed.
+            gzip_level (int): zlib level of json.gz uploads.
+
+        Returns:
+            tuple: Bytes uploaded, and bytes of JSON before compression.
         """
-        bucket = storage_client.bucket(bucket_name)
+        bucket = get_storage_client().bucket(bucket_name)
 
         blob = bucket.blob(file_name)
+        content_type = "application/gzip" if output_format == "json.gz" else "application/json"
 
-        # Convert the list to newline-delimited JSON
-        json_data = "\n".join(
-            [json.dumps(record, default=DataHandling.serialize) for record in data_list]
-        )
-
-        # Upload the JSON data to GCS
-        blob.upload_from_string(json_data, content_type="application/json")
+        with blob.open("wb", content_type=content_type, chunk_size=UPLOAD_CHUNK_SIZE) as stream:
+            return DataHandling.write_table(
+                stream,
+                file_name,
+                data_list,
+                output_format,
+                background=True,
+                gzip_level=gzip_level,
+            )
 
         # print(f"List saved as JSON to gs://{bucket_name}/{file_name}")
 
-    def load_gcs_to_bq(
+    @functools.lru_cache(maxsize=None)
+    def read_schema(table_name: str) -> list:
+        """Reads the BigQuery schema of a table from SCHEMA_DIR."""
+        with open(os.path.join(SCHEMA_DIR, f"{table_name}_schema.json")) as f:
+            return json.load(f)
+
+    def arrow_schema(table_name: str):
+        """Translates a table's BigQuery schema into a pyarrow schema."""
+        import pyarrow as pa
+
+        types = {
+            "INTEGER": pa.int64(),
+            "FLOAT": pa.float64(),
+            "STRING": pa.string(),
+            "DATE": pa.date32(),
+            "BOOLEAN": pa.bool_(),
+        }
+
+        def to_field(column):
+            if column["type"] == "RECORD":
+                field_type = pa.struct([to_field(f) for f in column["fields"]])
+            else:
+                field_type = types[column["type"]]
+            if column.get("mode") == "REPEATED":
+                return pa.field(column["name"], pa.list_(field_type))
+            return pa.field(
+                column["name"], field_type, nullable=column.get("mode") != "REQUIRED"
+            )
+
+        return pa.schema([to_field(c) for c in DataHandling.read_schema(table_name)])
+
+    def write_parquet(stream, table_name, data_list) -> int:
+        """Writes records or column arrays as typed Parquet to a binary file-like object.
+
+        Column types come from the table's BigQuery schema. A dict of column
+        arrays is converted to Arrow directly (dates stay date32, masked entries
+        become nulls), a SpilledTable's parts are copied over one at a time, and
+        records are converted PARQUET_ROW_GROUP_SIZE at a time.
+
+        Returns:
+            int: Number of rows written.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = DataHandling.arrow_schema(table_name)
+        written = 0
+        with pq.ParquetWriter(stream, schema, compression="snappy") as writer:
+            if isinstance(data_list, SpilledTable):
+                for table in data_list.tables():
+                    writer.write_table(table)
+                    written += table.num_rows
+            elif isinstance(data_list, dict):
+                num_rows = len(next(iter(data_list.values()), []))
+                for start in range(0, num_rows, PARQUET_ROW_GROUP_SIZE):
+                    arrays = []
+                    for schema_field in schema:
+                        column = np.asanyarray(
+                            data_list[schema_field.name][start : start + PARQUET_ROW_GROUP_SIZE]
+                        )
+                        arrays.append(
+                            pa.array(
+                                np.ma.getdata(column),
+                                mask=np.ma.getmaskarray(column),
+                                type=schema_field.type,
+                            )
+                        )
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    written += len(arrays[0]) if arrays else 0
+            else:
+                records = iter(data_list)
+                while chunk := list(itertools.islice(records, PARQUET_ROW_GROUP_SIZE)):
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    written += len(chunk)
+        return written
+
+    def parquet_to_gcs(bucket_name, file_name, table_name, data_list):
+        """Saves records or column arrays as a typed Parquet file to GCS.
+
+        Args:
+            bucket_name (str): The name of your GCS bucket.
+            file_name (str): The name of the Parquet file to be saved.
+            table_name (str): The table whose BigQuery schema types the columns.
+            data_list (list | dict): Records, or a dict of column arrays.
+
+        Returns:
+            tuple: Bytes uploaded, twice (Parquet is not compressed further).
+        """
+        blob = get_storage_client().bucket(bucket_name).blob(file_name)
+        with blob.open(
+            "wb", content_type="application/vnd.apache.parquet", chunk_size=UPLOAD_CHUNK_SIZE
+        ) as stream:
+            return DataHandling.write_table(
+                stream, table_name, data_list, "parquet", background=True
+            )
+
+    def export_to_gcs(
+        bucket_name,
+        data_name,
+        data_list,
+        output_format="json",
+        object_name=None,
+        gzip_level=GZIP_LEVEL,
+    ):
+        """Saves a table to gs://<bucket_name>/<object_name>.<ext> in `output_format`.
+
+        `object_name` defaults to the table name. Returns the bytes uploaded and
+        the bytes before compression.
+        """
+        extension, _ = OUTPUT_FORMATS[output_format]
+        file_name = f"{object_name or data_name}.{extension}"
+        if output_format == "parquet":
+            return DataHandling.parquet_to_gcs(bucket_name, file_name, data_name, data_list)
+        return DataHandling.json_to_gcs(
+            bucket_name, file_name, data_list, output_format, gzip_level=gzip_level
+        )
+
+    def start_load_gcs_to_bq(
         data_name: str,
         source_bucket: str,
         dataset_id: str,
+        output_format: str = "json",
+        object_name: str = None,
+        write_disposition: str = WRITE_TRUNCATE,
+        job_id: str = None,
     ):
-        client = bigquery.Client()
+        """Submits the BigQuery load job for a staged table without waiting for it."""
+        extension, _ = OUTPUT_FORMATS[output_format]
+        job_config = DataHandling.load_job_config(output_format, write_disposition)
+        uri = f"gs://{source_bucket}/{object_name or data_name}.{extension}"
+        client = get_bq_client()
+        table_ref = client.dataset(dataset_id).table(data_name)
+        return DataHandling.start_load_once(
+            client,
+            lambda attempt_id: client.load_table_from_uri(
+                uri, table_ref, job_config=job_config, job_id=attempt_id
+            ),
+            job_id,
+        )
+
+    def start_load_once(client, start, job_id: str = None):
+        """Starts a load job with `start(job_id)`, at most once per `job_id`.
+
+        If a job with that ID already exists (a retried run), it is returned
+        instead of loading the table again. A failed load appended nothing, so
+        the next ID of the series job_id, job_id_1, job_id_2, ... is tried.
+        Without a `job_id`, BigQuery picks a fresh one.
+        """
+        if job_id is None:
+            return start(None)
+        from google.api_core.exceptions import Conflict
+
+        for attempt in itertools.count():
+            attempt_id = job_id if attempt == 0 else f"{job_id}_{attempt}"
+            try:
+                return start(attempt_id)
+            except Conflict:
+                load_job = client.get_job(attempt_id)
+                if not (load_job.state == "DONE" and load_job.error_result):
+                    return load_job
+
+    def load_job_config(
+        output_format: str = "json",
+        write_disposition: str = WRITE_TRUNCATE,
+    ):
+        from google.cloud import bigquery
+
+        _, source_format = OUTPUT_FORMATS[output_format]
         job_config = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+            source_format=source_format,
+            write_disposition=write_disposition,
             # autodetect=True,
         )
-        uri = f"gs://{source_bucket}/{data_name}.json"
-        table_ref = bq_client.dataset(dataset_id).table(data_name)
-        load_job = client.load_table_from_uri(uri, table_ref, job_config=job_config)
-        load_job.result()
+        if output_format == "parquet":
+            # Map Parquet LIST columns (e.g. ingredients) onto REPEATED fields
+            job_config.parquet_options = bigquery.format_options.ParquetOptions()
+            job_config.parquet_options.enable_list_inference = True
+        return job_config
+
+    def write_table(
+        stream, data_name, data_list, output_format="json", background=False, gzip_level=GZIP_LEVEL
+    ) -> tuple:
+        """Writes a table in `output_format` to a binary file-like object.
+
+        The table is serialized in this thread. json.gz is gzip-compressed in
+        a GzipStream's thread, and with `background` the bytes are written to
+        `stream` from a QueuedStream's thread, so a slow upload does not hold
+        up serialization.
+
+        Returns:
+            tuple: Bytes written, and bytes before compression.
+        """
+        counting = CountingStream(stream)
+        writer = QueuedStream(counting, name="upload") if background else counting
+        target = GzipStream(writer, gzip_level) if output_format == "json.gz" else writer
+        try:
+            if output_format == "parquet":
+                DataHandling.write_parquet(target, data_name, data_list)
+            else:
+                text = io.TextIOWrapper(target, encoding="utf-8", write_through=True)
+                DataHandling.write_ndjson(text, data_list)
+                text.detach()
+        finally:
+            for queued in (target, writer):
+                if isinstance(queued, QueuedStream):
+                    queued.close()
+        raw_bytes = target.bytes_in if isinstance(target, GzipStream) else counting.bytes_written
+        return counting.bytes_written, raw_bytes
+
+    def report_load(data_name: str, load_job):
         if load_job.errors:
             print(load_job.errors)
         else:
             print(f"loaded {load_job.output_rows} to {data_name} successfully")
 
+    def load_job_seconds(load_job) -> float:
+        """How long BigQuery itself spent on a finished load job, if it says."""
+        started, ended = getattr(load_job, "started", None), getattr(load_job, "ended", None)
+        if isinstance(started, datetime) and isinstance(ended, datetime):
+            return (ended - started).total_seconds()
+        return None
+
+    def read_exported(bucket_name, data_name, output_format="json") -> list:
+        """Reads back the records of a table staged by a previous run."""
+        extension, _ = OUTPUT_FORMATS[output_format]
+        blob = get_storage_client().bucket(bucket_name).blob(f"{data_name}.{extension}")
+        if output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            with blob.open("rb") as stream:
+                return pq.read_table(stream).to_pylist()
+        if output_format == "json.gz":
+            with blob.open("rb") as stream, gzip.open(stream, "rt") as lines:
+                return [json.loads(line) for line in lines if line.strip()]
+        with blob.open("r") as stream:
+            return [json.loads(line) for line in stream if line.strip()]
+
+    def read_manifest(bucket_name) -> dict:
+        """Reads the generation manifest, or None if no run has completed yet."""
+        blob = get_storage_client().bucket(bucket_name).blob(MANIFEST_FILE)
+        if not blob.exists():
+            return None
+        return DataHandling.parse_manifest(blob.download_as_text())
+
+    def write_manifest(bucket_name, manifest: dict):
+        blob = get_storage_client().bucket(bucket_name).blob(MANIFEST_FILE)
+        blob.upload_from_string(
+            DataHandling.dump_manifest(manifest), content_type="application/json"
+        )
+
+    def parse_manifest(content: str) -> dict:
+        manifest = json.loads(content)
+        manifest["last_order_date"] = date.fromisoformat(manifest["last_order_date"])
+        return manifest
+
+    def dump_manifest(manifest: dict) -> str:
+        return json.dumps(manifest, default=DataHandling.serialize, indent=2)
+
+    def build_manifest(ids: "IdAllocator", last_order_date: date, loading: dict = None) -> dict:
+        """Records the last generated order_date and the highest ID per table.
+
+        `loading` marks a run whose tables are staged but not yet known to be
+        loaded (see main_incremental).
+        """
+        manifest = {
+            "last_order_date": last_order_date,
+            "high_water": dict(ids.high_water),
+            "generated_at": datetime.now(),
+        }
+        if loading is not None:
+            manifest["loading"] = loading
+        return manifest
+
+
+class LocalLoadJob:
+    """Stands in for a BigQuery load job when a table is only written locally."""
+
+    errors = None
+
+    def __init__(self, output_rows: int):
+        self.output_rows = output_rows
+
+    def done(self) -> bool:
+        return True
+
+    def result(self):
+        return self
+
+
+class Sink:
+    """Where export_tables puts tables, and how they get into BigQuery.
+
+    `stage` writes one table where a load job can read it, and returns a
+    handle on it, the number of bytes it wrote and the number of bytes
+    before compression. `load` starts the load job of a staged table
+    (anything with done(), result(), errors and output_rows), at most once
+    per `job_id`, and `discard` drops a staged table that will not be
+    loaded. Keeping them apart lets every table be staged before any of
+    them is loaded. With `durable_staging`, the handle is JSON-serializable
+    and still loadable by a later run. A sink also keeps
+    the manifest and reads back what a previous run exported, for the
+    incremental mode.
+    """
+
+    durable_staging = False
+
+    def stage(
+        self,
+        data_name: str,
+        data_list,
+        output_format: str = "json",
+        object_name: str = None,
+    ) -> tuple:
+        raise NotImplementedError
+
+    def load(
+        self,
+        data_name: str,
+        staged,
+        output_format: str = "json",
+        write_disposition: str = WRITE_TRUNCATE,
+        job_id: str = None,
+    ):
+        raise NotImplementedError
+
+    def discard(self, staged):
+        pass
+
+    def export(
+        self,
+        data_name: str,
+        data_list,
+        output_format: str = "json",
+        object_name: str = None,
+        write_disposition: str = WRITE_TRUNCATE,
+    ) -> tuple:
+        """Stages a table and starts its load; returns (load job, bytes, raw bytes)."""
+        staged, num_bytes, raw_bytes = self.stage(data_name, data_list, output_format, object_name)
+        return self.load(data_name, staged, output_format, write_disposition), num_bytes, raw_bytes
+
+    def read_exported(self, data_name: str, output_format: str = "json") -> list:
+        raise NotImplementedError
+
+    def read_manifest(self) -> dict:
+        raise NotImplementedError
+
+    def write_manifest(self, manifest: dict):
+        raise NotImplementedError
+
+
+class GcsSink(Sink):
+    """Stages every table in a bucket and loads it with load_table_from_uri."""
+
+    durable_staging = True
+
+    def __init__(self, bucket_name: str, dataset_id: str, gzip_level: int = GZIP_LEVEL):
+        self.bucket_name = bucket_name
+        self.dataset_id = dataset_id
+        self.gzip_level = gzip_level
+
+    def stage(self, data_name, data_list, output_format="json", object_name=None):
+        num_bytes, raw_bytes = DataHandling.export_to_gcs(
+            bucket_name=self.bucket_name,
+            data_name=data_name,
+            data_list=data_list,
+            output_format=output_format,
+            object_name=object_name,
+            gzip_level=self.gzip_level,
+        )
+        return object_name, num_bytes, raw_bytes
+
+    def load(
+        self, data_name, staged, output_format="json", write_disposition=WRITE_TRUNCATE, job_id=None
+    ):
+        return DataHandling.start_load_gcs_to_bq(
+            data_name=data_name,
+            source_bucket=self.bucket_name,
+            dataset_id=self.dataset_id,
+            output_format=output_format,
+            object_name=staged,
+            write_disposition=write_disposition,
+            job_id=job_id,
+        )
+
+    def read_exported(self, data_name, output_format="json"):
+        return DataHandling.read_exported(self.bucket_name, data_name, output_format)
+
+    def read_manifest(self):
+        return DataHandling.read_manifest(self.bucket_name)
+
+    def write_manifest(self, manifest):
+        DataHandling.write_manifest(self.bucket_name, manifest)
+
+
+class BigQuerySink(Sink):
+    """Loads every table straight from a local buffer with load_table_from_file.
+
+    Tables are serialized into a spooled temporary file, which is uploaded
+    once by the load job instead of being written to GCS and read back. A
+    staged table is thus held locally (in memory up to SPOOL_MAX_BYTES)
+    until it is loaded. The manifest
+    still lives in the bucket, and previous exports are read back from the
+    BigQuery tables themselves.
+    """
+
+    def __init__(
+        self, dataset_id: str, bucket_name: str = None, client=None, gzip_level: int = GZIP_LEVEL
+    ):
+        self.dataset_id = dataset_id
+        self.bucket_name = bucket_name
+        self.client = client
+        self.gzip_level = gzip_level
+
+    def stage(self, data_name, data_list, output_format="json", object_name=None):
+        buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        try:
+            num_bytes, raw_bytes = DataHandling.write_table(
+                buffer, data_name, data_list, output_format, gzip_level=self.gzip_level
+            )
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer, num_bytes, raw_bytes
+
+    def load(
+        self, data_name, staged, output_format="json", write_disposition=WRITE_TRUNCATE, job_id=None
+    ):
+        client = self.client or get_bq_client()
+        with staged:
+            return DataHandling.start_load_once(
+                client,
+                lambda attempt_id: client.load_table_from_file(
+                    staged,
+                    client.dataset(self.dataset_id).table(data_name),
+                    job_config=DataHandling.load_job_config(output_format, write_disposition),
+                    rewind=True,
+                    job_id=attempt_id,
+                ),
+                job_id,
+            )
+
+    def discard(self, staged):
+        staged.close()
+
+    def read_exported(self, data_name, output_format="json"):
+        client = self.client or get_bq_client()
+        table_ref = client.dataset(self.dataset_id).table(data_name)
+        return [dict(row.items()) for row in client.list_rows(table_ref)]
+
+    def read_manifest(self):
+        return DataHandling.read_manifest(self.bucket_name)
+
+    def write_manifest(self, manifest):
+        DataHandling.write_manifest(self.bucket_name, manifest)
+
+
+class LocalSink(Sink):
+    """Writes every table, and the manifest, to a local directory; loads nothing."""
+
+    durable_staging = True
+
+    def __init__(self, directory: str = LOCAL_SINK_DIR, gzip_level: int = GZIP_LEVEL):
+        self.directory = directory
+        self.gzip_level = gzip_level
+
+    def path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    def stage(self, data_name, data_list, output_format="json", object_name=None):
+        extension, _ = OUTPUT_FORMATS[output_format]
+        path = self.path(f"{object_name or data_name}.{extension}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as stream:
+            num_bytes, raw_bytes = DataHandling.write_table(
+                stream, data_name, data_list, output_format, gzip_level=self.gzip_level
+            )
+        return DataUtils.num_rows(data_list), num_bytes, raw_bytes
+
+    def load(
+        self, data_name, staged, output_format="json", write_disposition=WRITE_TRUNCATE, job_id=None
+    ):
+        return LocalLoadJob(staged)
+
+    def read_exported(self, data_name, output_format="json"):
+        extension, _ = OUTPUT_FORMATS[output_format]
+        path = self.path(f"{data_name}.{extension}")
+        if output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.read_table(path).to_pylist()
+        with (gzip.open(path, "rt") if output_format == "json.gz" else open(path)) as stream:
+            return [json.loads(line) for line in stream if line.strip()]
+
+    def read_manifest(self):
+        if not os.path.exists(self.path(MANIFEST_FILE)):
+            return None
+        with open(self.path(MANIFEST_FILE)) as f:
+            return DataHandling.parse_manifest(f.read())
+
+    def write_manifest(self, manifest):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(MANIFEST_FILE), "w") as f:
+            f.write(DataHandling.dump_manifest(manifest))
+
+
+def get_sink(config: "Config") -> Sink:
+    """The sink selected by `config.sink`."""
+    if config.sink == "gcs":
+        return GcsSink(config.bucket_name, config.dataset_id, gzip_level=config.gzip_level)
+    if config.sink == "bigquery":
+        return BigQuerySink(
+            config.dataset_id, config.bucket_name, gzip_level=config.gzip_level
+        )
+    if config.sink == "local":
+        return LocalSink(config.local_sink_dir, gzip_level=config.gzip_level)
+    raise ValueError(f"Unknown sink: {config.sink}")
+
+
+class DateSampler:
+    """Inverse-CDF sampler over consecutive days starting at `start_date`.
+
+    The cumulative distribution of the per-day weights is built once, so each
+    draw is a binary search (np.searchsorted) and N dates cost one vectorized
+    call instead of a pass over every day.
+    """
+
+    def __init__(self, start_date: date, weights: np.ndarray):
+        self.start_date = np.datetime64(start_date, "D")
+        cdf = np.cumsum(weights, dtype=float)
+        self.cdf = cdf / cdf[-1]
+
+    def __len__(self) -> int:
+        return len(self.cdf)
+
+    def sample(self, rng: np.random.Generator = None) -> date:
+        return self.sample_batch(1, rng=rng)[0].item()
+
+    def sample_batch(self, size: int, rng: np.random.Generator = None) -> np.ndarray:
+        """Draw `size` dates as a datetime64[D] array."""
+        if rng is None:
+            rng = np_rng
+        offsets = np.searchsorted(self.cdf, rng.random(size), side="right")
+        return self.start_date + np.minimum(offsets, len(self.cdf) - 1)
+
+    def split(self, num_parts: int) -> list:
+        """Split into consecutive day ranges of roughly equal probability mass.
+
+        Drawing a part by its mass and then a date from that part's sampler is
+        the same distribution as drawing from this sampler directly.
+
+        Returns:
+            list: (DateSampler, mass) pairs in date order; empty ranges are dropped.
+        """
+        weights = np.diff(self.cdf, prepend=0.0)
+        cuts = np.searchsorted(self.cdf, np.linspace(0, 1, num_parts + 1)[1:-1], side="right")
+        edges = np.unique(np.concatenate(([0], cuts, [len(self.cdf)])))
+        parts = []
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            mass = weights[lo:hi].sum()
+            if mass > 0:
+                parts.append((DateSampler(self.start_date + lo, weights[lo:hi]), mass))
+        return parts
+
+    def window(self, first_day: date, last_day: date) -> tuple:
+        """The days from `first_day` to `last_day` (inclusive) on their own.
+
+        Returns:
+            tuple: (DateSampler over those days, their probability mass), or
+            (None, 0.0) if none of them is in range.
+        """
+        weights = np.diff(self.cdf, prepend=0.0)
+        lo = max(int((np.datetime64(first_day, "D") - self.start_date).astype(int)), 0)
+        hi = min(int((np.datetime64(last_day, "D") - self.start_date).astype(int)) + 1, len(self))
+        if hi <= lo or weights[lo:hi].sum() <= 0:
+            return None, 0.0
+        return DateSampler(self.start_date + lo, weights[lo:hi]), float(weights[lo:hi].sum())
+
+
+class AliasSampler:
+    """Walker/Vose alias table over a fixed discrete distribution.
+
+    Built once in O(k); every draw afterwards is O(1) regardless of the
+    number of outcomes, and N draws are a single vectorized call.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=float)
+        k = len(weights)
+        total = weights.sum()
+        if total <= 0:
+            weights = np.ones(k)  # Uniform if all weights are 0
+            total = k
+        scaled = weights * k / total
+
+        self.prob = np.ones(k)
+        self.alias = np.arange(k)
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample_batch(self, size: int, rng: np.random.Generator = None) -> np.ndarray:
+        """Draw `size` outcome indices."""
+        if rng is None:
+            rng = np_rng
+        column = rng.integers(0, len(self.prob), size)
+        return np.where(rng.random(size) < self.prob[column], column, self.alias[column])
+
+
+class CategoricalColumn:
+    """A low-cardinality string column stored as small integer codes.
+
+    `categories[codes]` are the values. Slicing and fancy indexing stay
+    categorical, and NumPy sees the decoded object array through __array__,
+    so exporters and np.asanyarray() callers need no special casing.
+    """
+
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, codes: np.ndarray, categories):
+        self.categories = np.asarray(categories, dtype=object)
+        dtype = np.uint8 if len(self.categories) <= 256 else np.uint16
+        self.codes = np.asarray(codes).astype(dtype, copy=False)
+
+    @classmethod
+    def from_values(cls, values, categories=None) -> "CategoricalColumn":
+        values = np.asarray(values, dtype=object)
+        if categories is None:
+            categories = sorted(set(values.tolist()))
+        lookup = {c: i for i, c in enumerate(categories)}
+        return cls(np.fromiter((lookup[v] for v in values), np.int64, len(values)), categories)
+
+    @classmethod
+    def concatenate(cls, parts: list) -> "CategoricalColumn":
+        categories = parts[0].categories
+        if any(not np.array_equal(part.categories, categories) for part in parts):
+            return cls.from_values(np.concatenate([np.asarray(part) for part in parts]))
+        return cls(np.concatenate([part.codes for part in parts]), categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.categories[self.codes[key]]
+        return CategoricalColumn(self.codes[key], self.categories)
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            matches = np.flatnonzero(self.categories == other)
+            return self.codes == matches[0] if len(matches) else np.zeros(len(self), bool)
+        return np.asarray(self) == other
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.categories[self.codes]
+        return values if dtype is None else values.astype(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.categories.nbytes
+
+
+class ColumnTable(dict):
+    """A table held as a dict of equally long columns.
+
+    Numeric and date columns are typed NumPy arrays, nullable ones masked
+    arrays and low-cardinality strings CategoricalColumns. Being a dict, it
+    goes everywhere "a dict of column arrays" is accepted; `row(i)` and
+    `rows()` give `__slots__` row views where per-row access is needed.
+    """
+
+    @property
+    def num_rows(self) -> int:
+        return len(next(iter(self.values()), []))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers (masks and category codes included)."""
+        total = 0
+        for column in self.values():
+            total += column.nbytes
+            if np.ma.isMaskedArray(column) and column.mask is not np.ma.nomask:
+                total += column.mask.nbytes
+        return total
+
+    def row(self, index: int):
+        """A row view of row `index`, with one attribute per column."""
+        return self._row_type(tuple(self))(
+            *(np.asanyarray(column[index : index + 1]).tolist()[0] for column in self.values())
+        )
+
+    def rows(self, chunk_size: int = NDJSON_CHUNK_RECORDS):
+        """Lazily yield row views, decoding one chunk of every column at a time."""
+        row_type = self._row_type(tuple(self))
+        for start in range(0, self.num_rows, chunk_size):
+            values = [
+                np.asanyarray(column[start : start + chunk_size]).tolist()
+                for column in self.values()
+            ]
+            for row in zip(*values):
+                yield row_type(*row)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _row_type(names: tuple) -> type:
+        def __init__(self, *values):
+            for name, value in zip(names, values):
+                setattr(self, name, value)
+
+        def __getitem__(self, name):
+            return getattr(self, name)
+
+        def __repr__(self):
+            return "Row(" + ", ".join(f"{n}={getattr(self, n)!r}" for n in names) + ")"
+
+        return type(
+            "Row",
+            (),
+            {
+                "__slots__": names,
+                "__init__": __init__,
+                "__getitem__": __getitem__,
+                "__repr__": __repr__,
+            },
+        )
+
+
+class SpilledTable:
+    """A table spilled chunk by chunk to Parquet part files in a directory.
+
+    Only the row count is kept in memory. Exporters read the parts back one
+    at a time, so a table larger than memory can still be staged as a single
+    object. A reader can start before the table is complete: tables() waits
+    for further parts until finish() (or fail()) is called. `checks` are
+    called with every chunk's columns, and the matching chunks of the parent
+    tables it refers to, before it is written.
+    """
+
+    def __init__(self, table_name: str, directory: str):
+        self.table_name = table_name
+        self.directory = directory
+        self.parts = []
+        self.num_rows = 0
+        self.checks = []
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, columns: dict, parents: dict = None):
+        """Writes a chunk of columns as the next part file.
+
+        `parents` maps parent tables still being generated to the chunk this
+        one refers to (e.g. {"orders": order_columns} for order items).
+        """
+        for check in self.checks:
+            check(columns, parents or {})
+        path = os.path.join(self.directory, f"part-{len(self.parts):05d}.parquet")
+        with open(path, "wb") as stream:
+            num_rows = DataHandling.write_parquet(stream, self.table_name, columns)
+        with self.condition:
+            self.parts.append(path)
+            self.num_rows += num_rows
+            self.condition.notify_all()
+
+    def finish(self):
+        """Marks the table complete, ending the readers' tables() loops."""
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def fail(self, error: BaseException):
+        """Marks the table as never to be completed; readers raise `error`."""
+        with self.condition:
+            self.error = error
+            self.condition.notify_all()
+
+    def tables(self):
+        """Yields the parts as pyarrow tables, in order, as they are written."""
+        import pyarrow.parquet as pq
+
+        index = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: index < len(self.parts) or self.finished or self.error
+                )
+                if self.error is not None:
+                    raise self.error
+                if index == len(self.parts):
+                    return
+                path = self.parts[index]
+            yield pq.read_table(path)
+            index += 1
+
+    def records(self, chunk_size: int = NDJSON_CHUNK_RECORDS):
+        """Lazily yields row dicts, converting `chunk_size` rows at a time."""
+        for table in self.tables():
+            for start in range(0, table.num_rows, chunk_size):
+                yield from table.slice(start, chunk_size).to_pylist()
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class IdAllocator:
+    """Hands out contiguous ID ranges per table.
+
+    Each run builds its own allocator, so IDs restart with every run (or
+    continue from a manifest's high-water marks) rather than from whatever a
+    warm instance counted to before. Shards reserve disjoint blocks up
+    front and number their rows independently.
+    """
+
+    def __init__(self, high_water: dict = None):
+        self.high_water = dict(high_water or {})
+        self._lock = threading.Lock()
+
+    def next_id(self, table_name: str) -> int:
+        """The first ID the next reservation for `table_name` will get."""
+        return self.high_water.get(table_name, ID_START.get(table_name, 1) - 1) + 1
+
+    def reserve(self, table_name: str, count: int) -> int:
+        """Reserves `count` IDs and returns the first one."""
+        with self._lock:
+            first = self.next_id(table_name)
+            self.high_water[table_name] = first + count - 1
+        return first
+
+    def allocate(self, table_name: str, count: int) -> np.ndarray:
+        """Reserves `count` IDs and returns them as an int64 array."""
+        first = self.reserve(table_name, count)
+        return np.arange(first, first + count, dtype=np.int64)
+
+    def reserve_blocks(self, table_name: str, counts) -> np.ndarray:
+        """Reserves one contiguous block per count and returns their first IDs."""
+        counts = np.asarray(counts, dtype=np.int64)
+        first = self.reserve(table_name, int(counts.sum()))
+        return first + np.concatenate(([0], np.cumsum(counts)[:-1]))
+
 
 class DataUtils:
     # SEASONAL_WEIGHTS = {
@@ -184,20 +1364,46 @@ class DataUtils:
 
     @staticmethod
     def child_created_at(parent_date: date, month_weights: dict = None) -> date:
+        """Random date after `parent_date`, weighted by the month it falls in."""
+        return DataUtils.child_created_at_sampler(
+            parent_date, month_weights=month_weights
+        ).sample()
+
+    @staticmethod
+    def child_created_at_batch(
+        parent_date: date, size: int, month_weights: dict = None, rng=None
+    ) -> np.ndarray:
+        """Vectorized child_created_at returning a datetime64[D] array of `size` dates."""
+        return DataUtils.child_created_at_sampler(
+            parent_date, month_weights=month_weights
+        ).sample_batch(size, rng=rng)
+
+    @staticmethod
+    def child_created_at_sampler(
+        parent_date: date, end_date: date = None, month_weights: dict = None
+    ) -> DateSampler:
+        """Return the cached DateSampler behind child_created_at."""
         if month_weights is None:
             month_weights = DataUtils.SEASONAL_WEIGHTS
-        time_between_dates = (date.today() - parent_date).days
-        time_between_dates = max(time_between_dates, 2)
-        # if time_between_dates <= 1:
-        #     time_between_dates = 2
-        random_number_of_days = random.randrange(1, time_between_dates)
-        random_date = parent_date + timedelta(days=random_number_of_days)
-        random_month = random_date.month
-        adjusted_weight = month_weights[random_month]
-        if random.random() > adjusted_weight:
-            return DataUtils.child_created_at(parent_date)  # Retry if not accepted
-        return random_date
-    
+        if end_date is None:
+            end_date = date.today()
+        return DataUtils._build_child_sampler(
+            parent_date, end_date, tuple(sorted(month_weights.items()))
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _build_child_sampler(
+        parent_date: date, end_date: date, month_weights: tuple
+    ) -> DateSampler:
+        # A uniform day in [1, time_between_dates) accepted with its month
+        # weight is the same as drawing each day proportionally to that weight.
+        time_between_dates = max((end_date - parent_date).days, 2)
+        days = np.datetime64(parent_date, "D") + np.arange(1, time_between_dates)
+        month_lookup = np.array([0.0] + [weight for _, weight in month_weights])
+        weights = month_lookup[days.astype("datetime64[M]").astype(int) % 12 + 1]
+        return DateSampler(parent_date + timedelta(days=1), weights)
+
     @staticmethod
     def enhanced_created_at(parent_date: date, month_weights=None, linear_factor=0.6) -> date:
         """
@@ -211,43 +1417,517 @@ class DataUtils:
         Returns:
             A date object
         """
+        return DataUtils.enhanced_created_at_sampler(
+            parent_date, month_weights=month_weights, linear_factor=linear_factor
+        ).sample()
+
+    @staticmethod
+    def enhanced_created_at_batch(
+        parent_date: date, size: int, month_weights=None, linear_factor=0.6, rng=None
+    ) -> np.ndarray:
+        """
+        Vectorized counterpart of enhanced_created_at drawing `size` dates at once.
+
+        Returns:
+            A datetime64[D] array of length `size`
+        """
+        return DataUtils.enhanced_created_at_sampler(
+            parent_date, month_weights=month_weights, linear_factor=linear_factor
+        ).sample_batch(size, rng=rng)
+
+    @staticmethod
+    def enhanced_created_at_sampler(
+        parent_date: date, end_date: date = None, month_weights=None, linear_factor=0.6
+    ) -> "DateSampler":
+        """Return the cached DateSampler behind enhanced_created_at."""
         if month_weights is None:
             month_weights = DataUtils.SEASONAL_WEIGHTS
-            
-        end_date = date.today()
-        days_between = (end_date - parent_date).days
-        days_between = max(days_between, 2)
-        
-        # Build a probability array with linear increasing weights
-        # This ensures a steady increase toward today
-        weights = []
-        for i in range(days_between):
-            # Normalize position to 0-1 range
-            position = i / (days_between - 1)
-            
-            # Linear increase with optional quadratic component
-            # linear_factor=0 gives purely linear increase
-            # linear_factor=1 gives quadratic increase
-            weight = position * (1 - linear_factor) + (position ** 2) * linear_factor
-            
-            # Apply a small random jitter to avoid perfect linearity
-            jitter = random.uniform(0.95, 1.05)
-            weights.append(weight * jitter)
-        
-        # Try to find a date that passes seasonal filter
-        for _ in range(3):
-            # Select day based on weights
-            day_index = random.choices(range(days_between), weights=weights)[0]
-            random_date = parent_date + timedelta(days=day_index)
-            
-            # Apply seasonal month weighting
-            month_weight = month_weights[random_date.month]
-            if random.random() <= month_weight:
-                return random_date
-        
-        # If seasonal filtering fails, just use weighted selection directly
-        day_index = random.choices(range(days_between), weights=weights)[0]
-        return parent_date + timedelta(days=day_index)
+        if end_date is None:
+            end_date = date.today()
+        return DataUtils._build_enhanced_sampler(
+            parent_date, end_date, tuple(sorted(month_weights.items())), linear_factor
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _build_enhanced_sampler(
+        parent_date: date, end_date: date, month_weights: tuple, linear_factor: float
+    ) -> "DateSampler":
+        days_between = max((end_date - parent_date).days, 2)
+
+        # Linear increase toward today with optional quadratic component
+        # (linear_factor=0 is purely linear, 1 is quadratic), plus a small
+        # jitter to avoid perfect linearity. The jitter is seeded by the date
+        # range, so every process and run sees the same distribution.
+        position = np.arange(days_between) / (days_between - 1)
+        weights = position * (1 - linear_factor) + (position**2) * linear_factor
+        jitter_rng = np.random.default_rng([parent_date.toordinal(), end_date.toordinal()])
+        weights = weights * jitter_rng.uniform(0.95, 1.05, days_between)
+        p = weights / weights.sum()
+
+        # enhanced_created_at tries three draws against the seasonal month
+        # weight and falls back to an unfiltered draw, so the resulting
+        # distribution is p * (a * (1 - (1 - alpha)^3) / alpha + (1 - alpha)^3)
+        # with a the month weight of each day and alpha the acceptance rate.
+        month_lookup = np.array([0.0] + [weight for _, weight in month_weights])
+        days = np.datetime64(parent_date, "D") + np.arange(days_between)
+        a = month_lookup[days.astype("datetime64[M]").astype(int) % 12 + 1]
+        alpha = (p * a).sum()
+        miss = (1 - alpha) ** 3
+        return DateSampler(parent_date, p * (a * (1 - miss) / alpha + miss))
+
+    @staticmethod
+    def columns_to_records(columns: dict) -> list:
+        """Turn a dict of column arrays into a list of row dicts.
+
+        Masked entries become None and datetime64[D] values become date objects,
+        matching what the dataclass `.__dict__` rows contain.
+        """
+        return list(DataUtils.iter_records(columns))
+
+    @staticmethod
+    def num_rows(data) -> int:
+        """Row count of a table given either as records or as a dict of column arrays."""
+        if isinstance(data, SpilledTable):
+            return data.num_rows
+        if isinstance(data, dict):
+            return len(next(iter(data.values()), []))
+        return len(data)
+
+    @staticmethod
+    def column_values(data, name: str) -> np.ndarray:
+        """One column of a table given either as records or as a dict of column arrays."""
+        if isinstance(data, dict):
+            return np.asanyarray(data[name])
+        return np.array([record[name] for record in data])
+
+    @staticmethod
+    def column_chunks(data, names: list):
+        """Yields {name: column} for one chunk of a table at a time.
+
+        In-memory tables are a single chunk; spilled tables yield one
+        pyarrow-backed chunk per part file, reading only `names`.
+        """
+        if isinstance(data, SpilledTable):
+            import pyarrow.parquet as pq
+
+            for path in data.parts:
+                table = pq.read_table(path, columns=names)
+                yield {name: table.column(name) for name in names}
+        elif isinstance(data, dict):
+            yield {name: data[name] for name in names if name in data}
+        else:
+            yield {name: [record.get(name) for record in data] for name in names}
+
+    @staticmethod
+    def null_count(column) -> int:
+        """Number of missing values in a masked, categorical, arrow or plain column."""
+        if hasattr(column, "null_count"):
+            return column.null_count
+        if isinstance(column, CategoricalColumn):
+            missing = np.flatnonzero(np.equal(column.categories, None))
+            return int(np.isin(column.codes, missing).sum()) if len(missing) else 0
+        if np.ma.isMaskedArray(column):
+            return int(np.ma.count_masked(column))
+        values = np.asarray(column)
+        if values.dtype == object:
+            return int(np.equal(values, None).sum())
+        if values.dtype.kind == "f":
+            return int(np.isnan(values).sum())
+        return 0
+
+    @staticmethod
+    def key_values(column) -> np.ndarray:
+        """The non-missing values of an integer ID column as an int64 array."""
+        if hasattr(column, "drop_null"):
+            return column.drop_null().to_numpy().astype(np.int64, copy=False)
+        if np.ma.isMaskedArray(column):
+            return column.compressed().astype(np.int64, copy=False)
+        values = np.asarray(column)
+        if values.dtype == object:
+            values = values[np.not_equal(values, None)]
+        return values.astype(np.int64, copy=False)
+
+    @staticmethod
+    def missing_keys(keys: np.ndarray, parent_keys: np.ndarray) -> np.ndarray:
+        """The distinct values of `keys` that are not in `parent_keys`.
+
+        IDs are dense integers, so membership is a lookup in a boolean bitmap
+        over their range (O(n)); sparse ranges fall back to np.isin's sort.
+        """
+        if not len(keys):
+            return keys
+        if not len(parent_keys):
+            return np.unique(keys)
+        low = min(int(keys.min()), int(parent_keys.min()))
+        high = max(int(keys.max()), int(parent_keys.max()))
+        if high - low <= 8 * (len(keys) + len(parent_keys)):
+            present = np.zeros(high - low + 1, dtype=bool)
+            present[parent_keys - low] = True
+            missing = keys[~present[keys - low]]
+        else:
+            missing = keys[~np.isin(keys, parent_keys)]
+        return np.unique(missing)
+
+    @staticmethod
+    def concat_columns(parts: list) -> ColumnTable:
+        """Concatenate dicts of column arrays with the same columns, keeping masks
+        and categorical codes."""
+        columns = ColumnTable()
+        for name in parts[0]:
+            values = [part[name] for part in parts]
+            if all(isinstance(v, CategoricalColumn) for v in values):
+                columns[name] = CategoricalColumn.concatenate(values)
+            elif any(np.ma.isMaskedArray(v) for v in values):
+                columns[name] = np.ma.concatenate(values)
+            else:
+                columns[name] = np.concatenate([np.asarray(v) for v in values])
+        return columns
+
+    @staticmethod
+    def as_records(data):
+        """Rows of a table given either as records or as a dict of column arrays."""
+        if isinstance(data, SpilledTable):
+            return data.records()
+        if isinstance(data, dict):
+            return DataUtils.iter_records(data)
+        return data
+
+    @staticmethod
+    def iter_records(columns: dict, chunk_size: int = NDJSON_CHUNK_RECORDS):
+        """Lazily yield row dicts from a dict of column arrays, one chunk at a time."""
+        names = list(columns)
+        num_rows = len(next(iter(columns.values()), []))
+        for start in range(0, num_rows, chunk_size):
+            values = [
+                np.asanyarray(column[start : start + chunk_size]).tolist()
+                for column in columns.values()
+            ]
+            for row in zip(*values):
+                yield dict(zip(names, row))
+
+
+class ProductSampler:
+    """Precomputed category and product draws for generate_order_items.
+
+    Product weights are the average rating times the seasonal factor, which
+    only depends on (category, month), so one alias table per key is cached
+    instead of rebuilding weights for every order item. Category draws per
+    customer gender come from CUSTOMER_SEGMENTS.
+    """
+
+    def __init__(self, products: list, month_weights: dict = None):
+        self.month_weights = month_weights or DataUtils.SEASONAL_WEIGHTS
+        self.product_id = np.array([p["product_id"] for p in products], dtype=np.int64)
+        self.price = np.array([p["price"] for p in products], dtype=float)
+        self.cost = np.array([p["cost"] for p in products], dtype=float)
+        self.rating = np.array([p.get("average_rating", 3) for p in products], dtype=float)
+
+        category_products = {}
+        for i, product in enumerate(products):
+            category_products.setdefault(product["category"], []).append(i)
+        self.categories = list(category_products)
+        self.category_products = [np.array(category_products[c]) for c in self.categories]
+
+        self.genders = list(CUSTOMER_SEGMENTS)
+        self.category_samplers = [
+            self._category_sampler(CUSTOMER_SEGMENTS[gender]) for gender in self.genders
+        ] + [self._category_sampler(CATEGORY_WEIGHTS)]
+        self._product_samplers = {}
+
+    def _category_sampler(self, weights: dict) -> AliasSampler:
+        return AliasSampler([weights.get(c, 0) for c in self.categories])
+
+    def gender_codes(self, genders) -> np.ndarray:
+        """Map gender strings to category sampler indices (unknown -> CATEGORY_WEIGHTS)."""
+        lookup = {g: i for i, g in enumerate(self.genders)}
+        return np.array([lookup.get(g, len(self.genders)) for g in genders], dtype=np.int64)
+
+    def product_sampler(self, category: int, month: int) -> AliasSampler:
+        key = (category, month)
+        if key not in self._product_samplers:
+            seasonal_factor = self.month_weights.get(month, 1.0)
+            ratings = self.rating[self.category_products[category]]
+            self._product_samplers[key] = AliasSampler(ratings * seasonal_factor)
+        return self._product_samplers[key]
+
+    def sample_categories(self, gender_codes: np.ndarray, rng=None) -> np.ndarray:
+        """Draw one category index per entry of `gender_codes`."""
+        categories = np.empty(len(gender_codes), dtype=np.int64)
+        for code in np.unique(gender_codes):
+            mask = gender_codes == code
+            categories[mask] = self.category_samplers[code].sample_batch(mask.sum(), rng)
+        return categories
+
+    def sample_products(self, categories: np.ndarray, months: np.ndarray, rng=None) -> np.ndarray:
+        """Draw one product position (index into `products`) per (category, month)."""
+        positions = np.empty(len(categories), dtype=np.int64)
+        keys = categories * 13 + months
+        for key in np.unique(keys):
+            mask = keys == key
+            category, month = divmod(int(key), 13)
+            picks = self.product_sampler(category, month).sample_batch(mask.sum(), rng)
+            positions[mask] = self.category_products[category][picks]
+        return positions
+
+
+class SupplierIndex:
+    """Products per supplier with cached rating-weighted samplers.
+
+    Built once from the supplier_id values actually present in `products`
+    (restricted to `suppliers` when given), so purchase orders only name
+    suppliers that have products and pick among their products by
+    average_rating without rescanning the catalog.
+    """
+
+    def __init__(self, products: list, suppliers=None):
+        product_suppliers = np.array([p["supplier_id"] for p in products], dtype=np.int64)
+        supplier_ids = np.unique(product_suppliers)
+        if suppliers is not None:
+            known = DataUtils.column_values(suppliers, "supplier_id").astype(np.int64)
+            supplier_ids = supplier_ids[np.isin(supplier_ids, known)]
+        if len(supplier_ids) == 0:
+            raise ValueError("No product has a supplier_id found in the suppliers data")
+
+        self.supplier_ids = supplier_ids
+        self.product_id = np.array([p["product_id"] for p in products], dtype=np.int64)
+        self.price = np.array([p["price"] for p in products], dtype=float)
+        self.cost = np.array([p["cost"] for p in products], dtype=float)
+        rating = np.array([p.get("average_rating", 3) for p in products], dtype=float)
+        self.products = [np.flatnonzero(product_suppliers == s) for s in supplier_ids]
+        self.samplers = [AliasSampler(rating[positions]) for positions in self.products]
+
+    def __len__(self) -> int:
+        return len(self.supplier_ids)
+
+    def sample(self, size: int, rng: np.random.Generator = None) -> tuple:
+        """Draw `size` (supplier index, product position) pairs.
+
+        Suppliers are uniform, products within a supplier weighted by rating.
+        """
+        if rng is None:
+            rng = np_rng
+        suppliers = rng.integers(0, len(self.supplier_ids), size)
+        positions = np.empty(size, dtype=np.int64)
+        for i, sampler in enumerate(self.samplers):
+            mask = suppliers == i
+            positions[mask] = self.products[i][sampler.sample_batch(mask.sum(), rng)]
+        return suppliers, positions
+
+
+class GeoIndex:
+    """Flat city arrays of a country's real states, for vectorized location draws.
+
+    Only entries with type "state" and at least one city are kept. Cities are
+    stored contiguously per state, with `offsets[i]:offsets[i + 1]` spanning
+    the cities of state i.
+    """
+
+    def __init__(self, geo_data: dict):
+        states = [
+            s for s in geo_data["states"] if s.get("type") == "state" and s["cities"]
+        ]
+        counts = np.array([len(s["cities"]) for s in states], dtype=np.int64)
+        self.state_names = np.array([s["name"] for s in states], dtype=object)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.state = np.repeat(np.arange(len(states)), counts)
+        cities = [city for s in states for city in s["cities"]]
+        self.city = np.array([c["name"] for c in cities], dtype=object)
+        self.latitude = np.array([float(c["latitude"]) for c in cities])
+        self.longitude = np.array([float(c["longitude"]) for c in cities])
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    def sample(self, size: int, mode: str = "state", rng: np.random.Generator = None) -> np.ndarray:
+        """Draw `size` city indices.
+
+        Args:
+            size (int): Number of locations.
+            mode (str): "state" picks a state uniformly, then one of its cities
+                uniformly. "population" weights states by their population,
+                approximated by their number of cities as the dataset has no
+                population figures, i.e. it picks a city uniformly.
+            rng (np.random.Generator): Random generator, defaults to the module one.
+        """
+        if rng is None:
+            rng = np_rng
+        if mode == "population":
+            return rng.integers(0, len(self.city), size)
+        if mode != "state":
+            raise ValueError(f"Unknown location sampling mode: {mode}")
+        state = rng.integers(0, len(self.state_names), size)
+        counts = self.offsets[state + 1] - self.offsets[state]
+        return self.offsets[state] + (rng.random(size) * counts).astype(np.int64)
+
+    def columns(self, indices: np.ndarray) -> "ColumnTable":
+        """Address columns (state, city, latitude, longitude) of sampled indices."""
+        return ColumnTable({
+            "address_state": CategoricalColumn(self.state[indices], self.state_names),
+            "address_city": self.city[indices],
+            "latitude": self.latitude[indices],
+            "longitude": self.longitude[indices],
+        })
+
+
+class NamePool:
+    """Faker names drawn once in bulk and reused for every customer and employee.
+
+    Faker calls are slow, so first names per gender, last names and email
+    domains are each drawn once into an array; rows then pick from them by
+    index, which keeps Faker's name frequencies.
+    """
+
+    def __init__(self, size: int = NAME_POOL_SIZE, domain_size: int = DOMAIN_POOL_SIZE):
+        faker = get_faker()
+        self.first_names = {
+            "m": np.array([faker.first_name_male() for _ in range(size)], dtype=object),
+            "f": np.array([faker.first_name_female() for _ in range(size)], dtype=object),
+        }
+        self.last_names = np.array([faker.last_name() for _ in range(size)], dtype=object)
+        self.domains = np.array(
+            [faker.safe_domain_name() for _ in range(domain_size)], dtype=object
+        )
+        self.first_names_lower = {
+            gender: np.array([n.lower() for n in names], dtype=object)
+            for gender, names in self.first_names.items()
+        }
+        self.last_names_lower = np.array([n.lower() for n in self.last_names], dtype=object)
+
+    def first_name(self, gender: str) -> str:
+        names = self.first_names[gender]
+        return names[random.randrange(len(names))]
+
+    def last_name(self) -> str:
+        return self.last_names[random.randrange(len(self.last_names))]
+
+    def domain(self) -> str:
+        return self.domains[random.randrange(len(self.domains))]
+
+    def people(self, size: int, rng: np.random.Generator = None) -> dict:
+        """Draw `size` genders with first names, last names and emails.
+
+        Returns:
+            dict: gender, first_name, last_name and email columns.
+        """
+        if rng is None:
+            rng = np_rng
+        genders = np.array(list(GENDER_WEIGHTS), dtype=object)
+        gender = genders[rng.choice(len(genders), size=size, p=_probabilities(GENDER_WEIGHTS))]
+        first_name = np.empty(size, dtype=object)
+        first_name_lower = np.empty(size, dtype=object)
+        for g in self.first_names:
+            mask = gender == g
+            picks = rng.integers(0, len(self.first_names[g]), mask.sum())
+            first_name[mask] = self.first_names[g][picks]
+            first_name_lower[mask] = self.first_names_lower[g][picks]
+        last = rng.integers(0, len(self.last_names), size)
+        domain = self.domains[rng.integers(0, len(self.domains), size)]
+        return {
+            "gender": gender,
+            "first_name": first_name,
+            "last_name": self.last_names[last],
+            "email": first_name_lower + self.last_names_lower[last] + "@" + domain,
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_name_pool() -> NamePool:
+    """The NamePool of this instance, built on first use and kept while warm."""
+    return NamePool()
+
+
+class SentenceBank:
+    """A deduplicated bank of free-text sentences sampled by index.
+
+    Holds `SENTENCE_BANK_SIZE` distinct Faker sentences plus, per case_type
+    and pet_type, every expansion of its TEXT_TEMPLATES. Rows draw indices in
+    batches instead of calling Faker per row, and the bank counts how many
+    distinct sentences it has handed out.
+    """
+
+    def __init__(self, sentences: list, templates: dict):
+        self.sentences = np.array(sentences, dtype=object)
+        self.templates = {key: np.array(v, dtype=object) for key, v in templates.items()}
+        self._emitted = set()
+
+    @classmethod
+    def build(cls, size: int = SENTENCE_BANK_SIZE) -> "SentenceBank":
+        faker = get_faker()
+        sentences = list(dict.fromkeys(faker.sentence(nb_words=10) for _ in range(size)))
+        templates = {}
+        for key, patterns in TEXT_TEMPLATES.items():
+            expanded = []
+            for pattern in patterns:
+                slots = [name for _, name, _, _ in string.Formatter().parse(pattern) if name]
+                for words in itertools.product(*(TEMPLATE_WORDS[slot] for slot in slots)):
+                    text = pattern.format(**dict(zip(slots, words)))
+                    expanded.append(text[0].upper() + text[1:])
+            templates[key] = list(dict.fromkeys(expanded))
+        return cls(sentences, templates)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"sentences": self.sentences.tolist(), "templates": {k: v.tolist() for k, v in self.templates.items()}}
+        )
+
+    @classmethod
+    def from_json(cls, content: str) -> "SentenceBank":
+        data = json.loads(content)
+        return cls(data["sentences"], data["templates"])
+
+    @property
+    def distinct_emitted(self) -> int:
+        """Number of distinct sentences handed out so far."""
+        return len(self._emitted)
+
+    def sample(self, keys, mode: str = "faker", rng: np.random.Generator = None) -> np.ndarray:
+        """Draw one sentence per entry of `keys` (case_type or pet_type values).
+
+        With mode "templates", keys that have TEXT_TEMPLATES get a sentence of
+        their own domain; everything else gets a Faker sentence.
+        """
+        if rng is None:
+            rng = np_rng
+        keys = np.asarray(keys, dtype=object)
+        text = self.sentences[rng.integers(0, len(self.sentences), len(keys))]
+        if mode == "templates":
+            for key in set(keys.tolist()) & set(self.templates):
+                mask = keys == key
+                pool = self.templates[key]
+                text[mask] = pool[rng.integers(0, len(pool), mask.sum())]
+        self._emitted.update(text.tolist())
+        return text
+
+
+@functools.lru_cache(maxsize=None)
+def get_sentence_bank(bucket_name: str = None) -> SentenceBank:
+    """The sentence bank, loaded from its cached artifact or built and cached.
+
+    Looks in this instance's /tmp cache, then the data bucket (if given); a
+    freshly built bank is written to both so later runs and instances reuse it.
+    """
+    local_path = os.path.join(SENTENCE_BANK_CACHE_DIR, SENTENCE_BANK_FILE)
+    if os.path.exists(local_path):
+        with open(local_path) as f:
+            return SentenceBank.from_json(f.read())
+
+    blob = (
+        get_storage_client().bucket(bucket_name).blob(f"data/{SENTENCE_BANK_FILE}")
+        if bucket_name
+        else None
+    )
+    if blob is not None and blob.exists():
+        bank = SentenceBank.from_json(blob.download_as_text())
+    else:
+        bank = SentenceBank.build()
+        if blob is not None:
+            blob.upload_from_string(bank.to_json(), content_type="application/json")
+
+    os.makedirs(SENTENCE_BANK_CACHE_DIR, exist_ok=True)
+    with open(local_path, "w") as f:
+        f.write(bank.to_json())
+    return bank
 
 
 @dataclass
@@ -292,33 +1972,9 @@ class Supplier:
     longitude: float
 
 
-@dataclass
-class Customer:
-    address_city: str
-    address_state: str
-    customer_id: int = field(default_factory=itertools.count(start=1).__next__)
-    first_name: str = field(init=False)
-    last_name: str = field(init=False)
-    email: str = field(init=False)
-    gender: str = field(init=False)
-    # address_city: InitVar[typing.Any] = None #TODO: commenting this out, no necessity to make sure the customer comes from the city of the store
-    loyalty_member: bool = field(init=False)
-
-    def __post_init__(self, address_city=None):
-        self.gender = random.choices(["m", "f"], weights=[0.37, 0.63])[0]
-        if self.gender == "m":
-            self.first_name = fake.first_name_male()
-        else:
-            self.first_name = fake.first_name_female()
-        self.last_name = fake.last_name()
-        self.email = f"{self.first_name.lower()}{self.last_name.lower()}@{fake.safe_domain_name()}"
-        # self.address_city = fake.city()
-        self.loyalty_member = random.choices([True, False], weights=[0.31, 0.69])[0]
-
-
 @dataclass
 class Employee:
-    employee_id: int = field(default_factory=itertools.count(start=100).__next__)
+    employee_id: int
     first_name: str = field(init=False)
     last_name: str = field(init=False)
     job_title: str = field(init=False)
@@ -336,12 +1992,12 @@ class Employee:
             "Inventory Manager" "Customer Service Representative",
         ]
         self.job_title = random.choice(job_titles)
-        self.gender = random.choices(["m", "f"], weights=[0.37, 0.63])[0]
-        if self.gender == "m":
-            self.first_name = fake.first_name_male()
-        else:
-            self.first_name = fake.first_name_female()
-        self.last_name = fake.last_name()
+        name_pool = get_name_pool()
+        self.gender = random.choices(
+            list(GENDER_WEIGHTS), weights=GENDER_WEIGHTS.values()
+        )[0]
+        self.first_name = name_pool.first_name(self.gender)
+        self.last_name = name_pool.last_name()
         self.hire_date = DataUtils.enhanced_created_at(CYMBAL_PETS_START_DATE)
         # print(date.today())
         # print(self.hire_date)
@@ -359,62 +2015,27 @@ class Order:
     shipping_address_city: str
     store_id: int
     order_date: date = field(init=False)
-    order_id: int = field(default_factory=itertools.count(start=1).__next__)
+    order_id: int
     order_type: str = field(init=False)
     payment_method: str = field(init=False)
     # cymbal_pets_start_date: InitVar[date] = None
 
     def __post_init__(self):
         self.order_date = DataUtils.enhanced_created_at(CYMBAL_PETS_START_DATE)
-        self.order_type = random.choices(["Online", "Offline"], weights=[0.61, 0.39])[0]
+        self.order_type = random.choices(
+            list(ORDER_TYPE_WEIGHTS), weights=ORDER_TYPE_WEIGHTS.values()
+        )[0]
+        payment_weights = PAYMENT_METHOD_WEIGHTS[self.order_type]
+        self.payment_method = random.choices(
+            list(payment_weights), weights=payment_weights.values()
+        )[0]
         if self.order_type == "Offline":
-            self.payment_method = random.choices(
-                ["Cash", "Credit Card"], weights=[0.35, 0.65]
-            )[0]
             self.shipping_address_city = None
         else:
-            self.payment_method = random.choices(
-                ["Credit Card", "Paypal", "Invoice"], weights=[0.41, 0.33, 0.26]
-            )[0]
             self.shipping_address_city = self.shipping_address_city
             self.store_id = None
 
 
-@dataclass
-class OrderItem:
-    order_id: int
-    product_id: int
-    order_item_id: int = field(default_factory=itertools.count(start=1).__next__)
-    quantity: int = field(init=False)
-    price: InitVar[Decimal] = None
-    cost: InitVar[Decimal] = None
-
-    def __post_init__(self, price: Decimal = None, cost: Decimal = None):
-        self.quantity = random.randint(1, 4)
-        self.price = self.quantity * price
-        self.cost = self.quantity * cost
-
-
-@dataclass
-class CustomerService:
-    customer_id: int
-    case_id: int = field(default_factory=itertools.count(start=1).__next__)
-    case_type: str = field(init=False)
-    case_status: str = field(init=False)
-    resolution_notes: str = field(init=False)
-    agent_id: int = field(init=False)
-
-    def __post_init__(self):
-        case_types = ["Return", "Complaint", "Product Question", "Payment Issue"]
-        self.case_type = random.choices(case_types, weights=(0.1, 0.5, 0.25, 0.15))[0]
-        case_status = ["Open", "In Progress", "Closed", "Escalated"]
-        self.case_status = random.choices(
-            case_status, weights=(0.45, 0.15, 0.45, 0.05)
-        )[0]
-        self.resolution_notes = fake.sentence(nb_words=10)
-        self.agent_id = random.randint(1, 7)
-
-
 @dataclass
 class NutritionAgent:
     food_id: int
@@ -422,27 +2043,6 @@ class NutritionAgent:
     nutritional_info: dict
 
 
-@dataclass
-class PetProfile:
-    customer_id: int
-    pet_type: str
-    pet_id: int = field(default_factory=itertools.count(start=1).__next__)
-    pet_name: str = field(init=False)
-    age: int = field(init=False)
-    weight: int = field(init=False)
-    activity_level: str = field(init=False)
-    dietary_needs: str = field(init=False)
-
-    def __post_init__(self):
-        self.pet_name = fake.first_name()
-        # self.pet_type = random.choice(pet_type)
-        self.age = random.randint(1, 10)
-        self.weight = random.randint(1, 20)
-        activity_level = ["Low", "Medium", "High"]
-        self.activity_level = random.choice(activity_level)
-        self.dietary_needs = fake.sentence(nb_words=10)
-
-
 @dataclass
 class DistributionCenter:
     distribution_center_id: int
@@ -452,46 +2052,19 @@ class DistributionCenter:
     latitude: float
     longitude: float
 
-# Test
-@dataclass
-class PurchaseOrder:
-    supplier_id: int
-    product_id: int
-    distribution_center_id: int
-    purchase_order_id: int = field(default_factory=itertools.count(start=1).__next__)
-    purchase_order_date: date = field(init=False)
-    purchase_delivery_date: date = field(init=False)
-    quantity: int = field(init=False)
-    price: InitVar[Decimal] = None
-    cost: InitVar[Decimal] = None
-
-    def __post_init__(self, price: Decimal = None, cost: Decimal = None):
-        self.purchase_order_date = DataUtils.enhanced_created_at(CYMBAL_PETS_START_DATE)
-        rand_days = random.choices(
-            [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-            weights=[0.06, 0.09, 0.11, 0.13, 0.15, 0.16, 0.12, 0.10, 0.05, 0.03],
-        )[0]
-        self.purchase_delivery_date = self.purchase_order_date + timedelta(
-            days=rand_days
-        )
-        self.quantity = random.choices(
-            [100, 500, 750, 1000, 3000, 6000, 10000],
-            weights=[0.08, 0.14, 0.21, 0.29, 0.16, 0.08, 0.04],
-        )[0]
-        self.price = self.quantity * price
-        self.cost = self.quantity * cost
-
-
-
 
 # ===== GENERATION FUNCTIONS =======================================================
 
 
-def generate_distribution_centers():
+def generate_distribution_centers(
+    distribution_center_data: list = None, bucket_name: str = None
+):
+    if distribution_center_data is None:
+        distribution_center_data = DataHandling.read_json(
+            bucket_name=bucket_name, file_name="distribution_centers_data"
+        )
     distribution_centers = []
-    for distribution_center in DataHandling.read_json(
-        bucket_name=BUCKET_NAME, file_name="distribution_centers_data"
-    ):
+    for distribution_center in distribution_center_data:
         distribution_centers.append(
             DistributionCenter(
                 distribution_center_id=distribution_center["distribution_center_id"],
@@ -510,124 +2083,369 @@ def generate_purchase_order_data(
     products: list,
     suppliers: list,
     distribution_centers: list,
-):
-    purchase_orders = []
-    for _ in range(num_of_purchase_orders):
-        # rand_supplier_id = random.choice(suppliers)["supplier_id"]
-        # workaround because ids of supplier doesnt match with products, need to adjust
-        rand_supplier_id = random.randint(101,117)
-        weights = []
-        eligible_products = [
-            p for p in products if p["supplier_id"] == rand_supplier_id
-        ]
-        for product in eligible_products:
-            base_rating = product.get("average_rating", 3)
-            weights.append(base_rating)
-
-            # Normalize weights (ensure they sum to 1 for random.choices)
-        total_weighted_rating = sum(weights)
-        if total_weighted_rating == 0:
-            product_weights = [1 / len(eligible_products)] * len(
-                eligible_products
-            )  # Uniform if all weights are 0
-        else:
-            product_weights = [r / total_weighted_rating for r in weights]
-
-        rand_product = random.choices(eligible_products, weights=product_weights)[0]
-        # rand_product = random.choices(eligible_products)[0]
-        rand_product_id = rand_product["product_id"]
-        rand_product_price = rand_product["price"]
-        rand_product_cost = rand_product["cost"]
-        rand_distribution_center_id = random.choice(distribution_centers)[
-            "distribution_center_id"
-        ]
-        purchase_orders.append(
-            PurchaseOrder(
-                supplier_id=rand_supplier_id,
-                product_id=rand_product_id,
-                distribution_center_id=rand_distribution_center_id,
-                price=rand_product_price,
-                cost=rand_product_cost,
-            ).__dict__
+    start_id: int = 1,
+    date_sampler: DateSampler = None,
+    supplier_index: SupplierIndex = None,
+    rng: np.random.Generator = None,
+) -> ColumnTable:
+    """Generate purchase orders column-wise.
+
+    Args:
+        num_of_purchase_orders (int): Number of purchase orders to generate.
+        products (list): Product rows to order.
+        suppliers (list): Supplier rows; only suppliers with products are used.
+        distribution_centers (list): Distribution center rows to deliver to.
+        start_id (int): First purchase_order_id of the batch.
+        date_sampler (DateSampler): Draws purchase_order_date, defaults to the
+            enhanced_created_at distribution since CYMBAL_PETS_START_DATE.
+        supplier_index (SupplierIndex): Prebuilt index of `products`.
+        rng (np.random.Generator): Random generator, defaults to the module one.
+
+    Returns:
+        ColumnTable: supplier_id, product_id, distribution_center_id,
+            purchase_order_id, purchase_order_date, purchase_delivery_date,
+            quantity, price and cost columns.
+    """
+    if rng is None:
+        rng = np_rng
+    if date_sampler is None:
+        date_sampler = DataUtils.enhanced_created_at_sampler(CYMBAL_PETS_START_DATE)
+    if supplier_index is None:
+        supplier_index = SupplierIndex(products, suppliers)
+    n = num_of_purchase_orders
+
+    supplier, positions = supplier_index.sample(n, rng)
+    center_ids = DataUtils.column_values(distribution_centers, "distribution_center_id")
+    order_date = date_sampler.sample_batch(n, rng=rng)
+    delivery_days = np.fromiter(DELIVERY_DAYS_WEIGHTS, dtype=np.int64)[
+        rng.choice(len(DELIVERY_DAYS_WEIGHTS), size=n, p=_probabilities(DELIVERY_DAYS_WEIGHTS))
+    ]
+    quantity = np.fromiter(PURCHASE_QUANTITY_WEIGHTS, dtype=np.int64)[
+        rng.choice(
+            len(PURCHASE_QUANTITY_WEIGHTS), size=n, p=_probabilities(PURCHASE_QUANTITY_WEIGHTS)
         )
-    return purchase_orders
+    ]
+
+    return ColumnTable({
+        "supplier_id": supplier_index.supplier_ids[supplier],
+        "product_id": supplier_index.product_id[positions],
+        "distribution_center_id": center_ids.astype(np.int64)[
+            rng.integers(0, len(center_ids), n)
+        ],
+        "purchase_order_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "purchase_order_date": order_date,
+        "purchase_delivery_date": order_date + delivery_days.astype("timedelta64[D]"),
+        "quantity": quantity,
+        "price": quantity * supplier_index.price[positions],
+        "cost": quantity * supplier_index.cost[positions],
+    })
+
+
+LOCATION_DATA_URL = "https://raw.githubusercontent.com/dr5hn/countries-states-cities-database/master/json/countries%2Bstates%2Bcities.json"
 
-def generate_location_data(country_iso3: str):
-    url = "https://raw.githubusercontent.com/dr5hn/countries-states-cities-database/master/json/countries%2Bstates%2Bcities.json"
-    response = requests.get(url)
+# Country location data already loaded by this (warm) instance, by iso3
+_location_cache = {}
+
+
+def location_cache_name(country_iso3: str) -> str:
+    return f"locations_{country_iso3}"
+
+
+def extract_location_data(country: dict) -> dict:
+    """Keeps only the state and city fields the generators read."""
+    return {
+        "iso3": country["iso3"],
+        "name": country["name"],
+        "states": [
+            {
+                "name": state["name"],
+                "type": state.get("type"),
+                "cities": [
+                    {
+                        "name": city["name"],
+                        "latitude": city["latitude"],
+                        "longitude": city["longitude"],
+                    }
+                    for city in state["cities"]
+                ],
+            }
+            for state in country["states"]
+        ],
+    }
+
+
+def download_location_data(country_iso3: str):
+    """Downloads the world dataset and extracts one country from it."""
+    import requests
+
+    response = requests.get(LOCATION_DATA_URL)
 
     if response.status_code != 200:
         print("Failed to fetch locationdata.")
         return None
 
-    data = response.json()
-    country_data = None
-    for c in data:
-        if c["iso3"] == country_iso3:
-            country_data = c
-    return country_data
+    country = next((c for c in response.json() if c["iso3"] == country_iso3), None)
+    return extract_location_data(country) if country else None
+
+
+def build_location_cache(
+    country_iso3: str, directory: str = LOCAL_DATA_DIR, bucket_name: str = None
+) -> dict:
+    """Extracts a compact per-country location file from the world dataset.
+
+    The file is written as data/locations_<iso3>.json to `directory` and, if
+    given, to the data bucket, where generate_location_data picks it up.
+    """
+    country_data = download_location_data(country_iso3)
+    if country_data is None:
+        raise ValueError(f"No location data found for {country_iso3}")
+    content = json.dumps(country_data, separators=(",", ":"))
+    file_name = f"{location_cache_name(country_iso3)}.json"
+    if directory:
+        with open(os.path.join(directory, file_name), "w") as f:
+            f.write(content)
+    if bucket_name:
+        get_storage_client().bucket(bucket_name).blob(f"data/{file_name}").upload_from_string(
+            content, content_type="application/json"
+        )
+    return country_data
+
+
+def generate_location_data(
+    country_iso3: str, bucket_name: str = None, directory: str = LOCAL_DATA_DIR
+):
+    """Location data of one country, from the cheapest source available.
+
+    Looks in this instance's memo, then the compact file in `directory`,
+    then the one cached in the data bucket, and only downloads the world
+    dataset as a last resort (writing the compact file to the bucket for the
+    next cold start). Bucket errors fall through to the next source, so the
+    data can still be found offline.
+    """
+    from google.api_core.exceptions import GoogleAPIError
+    from google.auth.exceptions import DefaultCredentialsError
+
+    if country_iso3 in _location_cache:
+        return _location_cache[country_iso3]
+
+    file_name = f"{location_cache_name(country_iso3)}.json"
+    local_path = os.path.join(directory, file_name) if directory else None
+
+    country_data = None
+    blob = None
+    if local_path and os.path.exists(local_path):
+        with open(local_path) as f:
+            country_data = json.load(f)
+    elif bucket_name:
+        try:
+            blob = get_storage_client().bucket(bucket_name).blob(f"data/{file_name}")
+            if blob.exists():
+                country_data = json.loads(blob.download_as_text())
+        except (GoogleAPIError, DefaultCredentialsError) as e:
+            print(f"Could not read {file_name} from the bucket: {e}")
+            blob = None
+
+    if country_data is None:
+        print(f"No cached location data for {country_iso3}, downloading")
+        country_data = download_location_data(country_iso3)
+        if country_data is not None and blob is not None:
+            try:
+                blob.upload_from_string(
+                    json.dumps(country_data, separators=(",", ":")),
+                    content_type="application/json",
+                )
+            except GoogleAPIError as e:
+                print(f"Could not cache {file_name} in the bucket: {e}")
+
+    if country_data is not None:
+        _location_cache[country_iso3] = country_data
+    return country_data
+
+
+class ReferenceData:
+    """Reference inputs fetched concurrently as soon as the loader is created.
+
+    Every file in `file_names` and the location data of `country_iso3` are
+    downloaded and parsed on a thread pool, so startup waits for the slowest
+    input instead of the sum of them. Products and distribution centers come
+    back as generated rows, stores and suppliers as the raw rows that
+    generate_stores / generate_suppliers place with the geo index, and the
+    location data together with its GeoIndex.
+
+    `source` "bucket" reads data/*.json from `bucket_name`; "local" reads the
+    same files from `directory`, so startup can be benchmarked offline.
+    """
+
+    PARSERS = {
+        "products_data": lambda rows: generate_products(rows),
+        "distribution_centers_data": lambda rows: generate_distribution_centers(rows),
+    }
+
+    def __init__(
+        self,
+        source: str = "bucket",
+        bucket_name: str = None,
+        directory: str = LOCAL_DATA_DIR,
+        country_iso3: str = "USA",
+        file_names: tuple = REFERENCE_FILES,
+        max_workers: int = None,
+    ):
+        if source not in REFERENCE_SOURCES:
+            raise ValueError(f"Unsupported reference source: {source}")
+        self.source = source
+        self.bucket_name = bucket_name
+        self.directory = directory
+        pool = ThreadPoolExecutor(
+            max_workers=max_workers or len(file_names) + 1, thread_name_prefix="reference"
+        )
+        self.futures = {name: pool.submit(self.load, name) for name in file_names}
+        if country_iso3:
+            self.futures["location_data"] = pool.submit(self.load_location, country_iso3)
+        pool.shutdown(wait=False)
+
+    def read(self, file_name: str) -> list:
+        if self.source == "local":
+            with open(os.path.join(self.directory, f"{file_name}.json")) as f:
+                return json.load(f)
+        return DataHandling.read_json(bucket_name=self.bucket_name, file_name=file_name)
+
+    def load(self, file_name: str):
+        rows = self.read(file_name)
+        parse = self.PARSERS.get(file_name)
+        return parse(rows) if parse else rows
+
+    def load_location(self, country_iso3: str) -> tuple:
+        local_path = os.path.join(self.directory or "", f"{location_cache_name(country_iso3)}.json")
+        if self.source == "local" and os.path.exists(local_path):
+            with open(local_path) as f:
+                location_data = json.load(f)
+        else:
+            location_data = generate_location_data(
+                country_iso3, bucket_name=self.bucket_name, directory=self.directory
+            )
+        return location_data, GeoIndex(location_data)
+
+    def get(self, name: str):
+        """The loaded input `name` (a file name or "location_data"), waiting for it."""
+        return self.futures[name].result()
+
+
+def generate_pet_profiles(customers: list, num_of_pet_profiles: int):
+    return DataUtils.columns_to_records(
+        generate_pet_profiles_batch(
+            customers=customers, num_of_pet_profiles=num_of_pet_profiles
+        )
+    )
+
+
+def generate_pet_profiles_batch(
+    customers: list,
+    num_of_pet_profiles: int,
+    start_id: int = 1,
+    rng: np.random.Generator = None,
+    text_mode: str = TEXT_MODE,
+    bucket_name: str = None,
+) -> dict:
+    """Generate pet profiles column-wise, with dietary_needs from the sentence bank.
+
+    Returns:
+        ColumnTable: customer_id, pet_type, pet_id, pet_name, age, weight,
+            activity_level and dietary_needs columns.
+    """
+    if rng is None:
+        rng = np_rng
+    n = num_of_pet_profiles
+    customer_ids = DataUtils.column_values(customers, "customer_id").astype(np.int64)
+    pet_type = CategoricalColumn(
+        rng.choice(len(PET_TYPE_WEIGHTS), size=n, p=_probabilities(PET_TYPE_WEIGHTS)),
+        list(PET_TYPE_WEIGHTS),
+    )
+    # Pet names are any first name, whatever the gender
+    name_pool = get_name_pool()
+    pet_names = np.concatenate(list(name_pool.first_names.values()))
+    sentence_bank = get_sentence_bank(bucket_name)
+    dietary_needs = sentence_bank.sample(np.asarray(pet_type), text_mode, rng=rng)
+    print(f"dietary_needs uses {sentence_bank.distinct_emitted} distinct sentences so far")
+
+    return ColumnTable({
+        "customer_id": customer_ids[rng.integers(0, len(customer_ids), n)],
+        "pet_type": pet_type,
+        "pet_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "pet_name": pet_names[rng.integers(0, len(pet_names), n)],
+        "age": rng.integers(1, 11, n),
+        "weight": rng.integers(1, 21, n),
+        "activity_level": CategoricalColumn(
+            rng.integers(0, len(ACTIVITY_LEVELS), n), ACTIVITY_LEVELS
+        ),
+        "dietary_needs": dietary_needs,
+    })
 
 
-def generate_pet_profiles(customers: list, num_of_pet_profiles: int):
-    pet_profiles = []
-    for _ in range(num_of_pet_profiles):
-        rand_cust = random.choice(customers)
-        rand_pet = random.choices(
-            ["Cat", "Dog", "Fish", "Bird", "Reptile", "Other"],
-            weights=[0.3, 0.25, 0.14, 0.09, 0.06, 0.16],
-        )[0]
-        pet_profiles.append(
-            PetProfile(customer_id=rand_cust["customer_id"], pet_type=rand_pet).__dict__
+def generate_customers(
+    num_of_customers: int, geo_data: dict, geo_index: GeoIndex = None
+):
+    return DataUtils.columns_to_records(
+        generate_customers_batch(
+            num_of_customers=num_of_customers, geo_data=geo_data, geo_index=geo_index
         )
+    )
+
 
-    return pet_profiles
+def generate_customers_batch(
+    num_of_customers: int,
+    geo_data: dict,
+    geo_index: GeoIndex = None,
+    start_id: int = 1,
+    name_pool: NamePool = None,
+    rng: np.random.Generator = None,
+) -> dict:
+    """Generate customers column-wise from the geo index and the name pool.
 
+    Returns:
+        ColumnTable: address_city, address_state, customer_id, gender,
+        first_name, last_name, email and loyalty_member columns, gender and
+        address_state categorical.
+    """
+    if rng is None:
+        rng = np_rng
+    if geo_index is None:
+        geo_index = GeoIndex(geo_data)
+    if name_pool is None:
+        name_pool = get_name_pool()
+    n = num_of_customers
 
-def generate_customers(num_of_customers: int, geo_data: dict):
-    customers = []
-    for i in range(num_of_customers):
-        randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        while geo_data["states"][randint_state]["type"] != "state":
-            randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        randint_city = random.randint(
-            0, len(geo_data["states"][randint_state]["cities"]) - 1
-        )
-        customers.append(
-            Customer(
-                address_state=geo_data["states"][randint_state]["name"],
-                address_city=geo_data["states"][randint_state]["cities"][randint_city][
-                    "name"
-                ],
-            ).__dict__
-        )
-    return customers
+    locations = geo_index.columns(geo_index.sample(n, rng=rng))
+    people = name_pool.people(n, rng=rng)
+    return ColumnTable({
+        "address_city": locations["address_city"],
+        "address_state": locations["address_state"],
+        "customer_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "gender": CategoricalColumn.from_values(people["gender"], list(GENDER_WEIGHTS)),
+        "first_name": people["first_name"],
+        "last_name": people["last_name"],
+        "email": people["email"],
+        "loyalty_member": rng.random(n) < LOYALTY_WEIGHTS[True],
+    })
 
 
-def generate_stores(geo_data: dict):
+def generate_stores(
+    geo_data: dict, geo_index: GeoIndex = None, store_data: list = None, bucket_name: str = None
+):
+    if geo_index is None:
+        geo_index = GeoIndex(geo_data)
+    if store_data is None:
+        store_data = DataHandling.read_json(bucket_name=bucket_name, file_name="stores_data")
+    locations = geo_index.columns(geo_index.sample(len(store_data)))
     stores = []
-    for store in DataHandling.read_json(
-        bucket_name=BUCKET_NAME, file_name="stores_data"
-    ):
-        randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        while geo_data["states"][randint_state]["type"] != "state":
-            randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        randint_city = random.randint(
-            0, len(geo_data["states"][randint_state]["cities"]) - 1
-        )
+    for store, location in zip(store_data, locations.rows()):
         stores.append(
             Store(
                 store_id=store["store_id"],
                 store_name=store["store_name"],
-                address_state=geo_data["states"][randint_state]["name"],
-                address_city=geo_data["states"][randint_state]["cities"][randint_city][
-                    "name"
-                ],
-                latitude=geo_data["states"][randint_state]["cities"][randint_city][
-                    "latitude"
-                ],
-                longitude=geo_data["states"][randint_state]["cities"][randint_city][
-                    "longitude"
-                ],
+                address_state=location.address_state,
+                address_city=location.address_city,
+                latitude=location.latitude,
+                longitude=location.longitude,
                 opening_hours=store["opening_hours"],
                 manager_id=store["manager_id"],
             ).__dict__
@@ -636,11 +2454,11 @@ def generate_stores(geo_data: dict):
     return stores
 
 
-def generate_products():
+def generate_products(product_data: list = None, bucket_name: str = None):
+    if product_data is None:
+        product_data = DataHandling.read_json(bucket_name=bucket_name, file_name="products_data")
     products = []
-    for product in DataHandling.read_json(
-        bucket_name=BUCKET_NAME, file_name="products_data"
-    ):
+    for product in product_data:
         products.append(
             Product(
                 product_id=product["product_id"],
@@ -661,17 +2479,21 @@ def generate_products():
     return products
 
 
-def generate_suppliers(geo_data: dict):
-    suppliers = []
-    for supplier in DataHandling.read_json(
-        bucket_name=BUCKET_NAME, file_name="suppliers_data"
-    ):
-        randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        while geo_data["states"][randint_state]["type"] != "state":
-            randint_state = random.randint(0, len(geo_data["states"]) - 1)
-        randint_city = random.randint(
-            0, len(geo_data["states"][randint_state]["cities"]) - 1
+def generate_suppliers(
+    geo_data: dict,
+    geo_index: GeoIndex = None,
+    supplier_data: list = None,
+    bucket_name: str = None,
+):
+    if geo_index is None:
+        geo_index = GeoIndex(geo_data)
+    if supplier_data is None:
+        supplier_data = DataHandling.read_json(
+            bucket_name=bucket_name, file_name="suppliers_data"
         )
+    locations = geo_index.columns(geo_index.sample(len(supplier_data)))
+    suppliers = []
+    for supplier, location in zip(supplier_data, locations.rows()):
         suppliers.append(
             Supplier(
                 supplier_id=supplier["supplier_id"],
@@ -679,23 +2501,17 @@ def generate_suppliers(geo_data: dict):
                 contact_name=supplier["contact_name"],
                 email=supplier["email"],
                 phone_number=supplier["phone_number"],
-                address_state=geo_data["states"][randint_state]["name"],
-                address_city=geo_data["states"][randint_state]["cities"][randint_city][
-                    "name"
-                ],
-                latitude=geo_data["states"][randint_state]["cities"][randint_city][
-                    "latitude"
-                ],
-                longitude=geo_data["states"][randint_state]["cities"][randint_city][
-                    "longitude"
-                ],
+                address_state=location.address_state,
+                address_city=location.address_city,
+                latitude=location.latitude,
+                longitude=location.longitude,
             ).__dict__
         )
     return suppliers
 
 
 def generate_orders(
-    customer_id: int = None, address_city: str = None, store_id: int = None
+    customer_id: int = None, address_city: str = None, store_id: int = None, order_id: int = 1
 ):
     orders = []
     orders.append(
@@ -703,11 +2519,88 @@ def generate_orders(
             customer_id=customer_id,
             shipping_address_city=address_city,
             store_id=store_id,
+            order_id=order_id,
         ).__dict__
     )
     return orders
 
 
+def generate_orders_batch(
+    num_of_orders: int,
+    customers: list,
+    stores: list,
+    start_id: int = 1,
+    date_sampler: DateSampler = None,
+    rng: np.random.Generator = None,
+) -> dict:
+    """Generate a whole batch of orders column-wise with NumPy.
+
+    Draws the same columns as the Order dataclass with the same weights and
+    Online/Offline nulling rules, but without a Python loop per order.
+
+    Args:
+        num_of_orders (int): Number of orders to generate.
+        customers (list): Customer rows to attach orders to.
+        stores (list): Store rows to attach orders to.
+        start_id (int): First order_id of the batch.
+        date_sampler (DateSampler): Draws order_date, defaults to the
+            enhanced_created_at distribution since CYMBAL_PETS_START_DATE.
+        rng (np.random.Generator): Random generator, defaults to the module one.
+
+    Returns:
+        ColumnTable: Columns in Order field order. Nullable columns are masked
+        arrays, order_type and payment_method are categorical.
+    """
+    if rng is None:
+        rng = np_rng
+    if date_sampler is None:
+        date_sampler = DataUtils.enhanced_created_at_sampler(CYMBAL_PETS_START_DATE)
+    n = num_of_orders
+
+    customer_ids = DataUtils.column_values(customers, "customer_id").astype(np.int64)
+    customer_cities = DataUtils.column_values(customers, "address_city").astype(object)
+    store_ids = DataUtils.column_values(stores, "store_id").astype(np.int64)
+
+    has_customer = rng.random(n) < CUSTOMER_ORDER_WEIGHTS[True]
+    rand_cust = rng.integers(0, len(customers), n)
+    rand_store = rng.integers(0, len(stores), n)
+
+    order_type = CategoricalColumn(
+        rng.choice(len(ORDER_TYPE_WEIGHTS), size=n, p=_probabilities(ORDER_TYPE_WEIGHTS)),
+        list(ORDER_TYPE_WEIGHTS),
+    )
+    is_offline = order_type == "Offline"
+
+    payment_methods = list(
+        dict.fromkeys(m for weights in PAYMENT_METHOD_WEIGHTS.values() for m in weights)
+    )
+    payment_codes = np.empty(n, dtype=np.int64)
+    for kind, weights in PAYMENT_METHOD_WEIGHTS.items():
+        mask = order_type == kind
+        codes = np.array([payment_methods.index(m) for m in weights])
+        payment_codes[mask] = codes[
+            rng.choice(len(codes), size=mask.sum(), p=_probabilities(weights))
+        ]
+
+    return ColumnTable({
+        "customer_id": np.ma.array(customer_ids[rand_cust], mask=~has_customer),
+        "shipping_address_city": np.ma.array(
+            customer_cities[rand_cust], mask=~has_customer | is_offline
+        ),
+        "store_id": np.ma.array(store_ids[rand_store], mask=~is_offline),
+        "order_date": date_sampler.sample_batch(n, rng=rng),
+        "order_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "order_type": order_type,
+        "payment_method": CategoricalColumn(payment_codes, payment_methods),
+    })
+
+
+def _probabilities(weights: dict) -> np.ndarray:
+    """Normalize a weights dict into a probability vector for rng.choice."""
+    p = np.fromiter(weights.values(), dtype=float)
+    return p / p.sum()
+
+
 # def generate_order_items(orders: list, products: list, customers: list):
 #     order_items = []
 #     # for order in orders:
@@ -753,94 +2646,413 @@ def generate_orders(
 
 
 def generate_order_items(orders: list, products: list, customers: list):
-    order_items = []
+    order_columns = {
+        "customer_id": np.ma.masked_equal(
+            [o.get("customer_id") or 0 for o in orders], 0
+        ),
+        "order_date": np.array([o["order_date"] for o in orders], dtype="datetime64[D]"),
+        "order_id": np.array([o["order_id"] for o in orders], dtype=np.int64),
+    }
+    return DataUtils.columns_to_records(
+        generate_order_items_batch(
+            order_columns=order_columns, products=products, customers=customers
+        )
+    )
 
-    # Precompute category -> products mapping
-    category_product_map = {}
-    for product in products:
-        category_product_map.setdefault(product["category"], []).append(product)
 
-    unique_categories = list(category_product_map.keys())
+def generate_order_items_batch(
+    order_columns: dict,
+    products: list,
+    customers: list,
+    start_id: int = 1,
+    product_sampler: ProductSampler = None,
+    rng: np.random.Generator = None,
+) -> dict:
+    """Generate the order items of a whole batch of orders column-wise.
 
-    # Precompute customer lookup
-    customer_lookup = {c["customer_id"]: c for c in customers}
+    Args:
+        order_columns (dict): Order columns as returned by generate_orders_batch;
+            customer_id, order_date and order_id are read.
+        products (list): Product rows to pick from.
+        customers (list): Customer rows, used for their gender.
+        start_id (int): First order_item_id of the batch.
+        product_sampler (ProductSampler): Prebuilt sampler for `products`.
+        rng (np.random.Generator): Random generator, defaults to the module one.
 
-    for order in orders:
-        customer_id = order.get("customer_id")
-        if customer_id:
-            customer = customer_lookup.get(order["customer_id"])
-            gender = customer.get("gender", "f") if customer else "f"
-        else:
-            gender = "f"
-        base_weights = CUSTOMER_SEGMENTS.get(gender, CATEGORY_WEIGHTS)
+    Returns:
+        ColumnTable: order_id, product_id, order_item_id, quantity, price
+            and cost columns.
+    """
+    if rng is None:
+        rng = np_rng
+    if product_sampler is None:
+        product_sampler = ProductSampler(products)
 
-        # num_of_items = random.randint(1, 5)
-        num_of_items = random.choices(
-            [1, 2, 3, 4, 5], weights=[0.25, 0.45, 0.18, 0.07, 0.05]
-        )[0]
-        order_month = order["order_date"].month
-
-        for _ in range(num_of_items):
-            chosen_category = random.choices(
-                unique_categories, weights=base_weights.values()
-            )[0]
-            eligible_products = category_product_map.get(chosen_category, [])
-
-            if not eligible_products:
-                continue  # Skip if no products exist in the chosen category
-
-            seasonal_weights = []
-            for product in eligible_products:
-                base_rating = product.get("average_rating", 3)
-
-                # Incorporate your SEASONAL_WEIGHTS here. Multiply the rating by the month weight
-                seasonal_factor = DataUtils.SEASONAL_WEIGHTS.get(order_month, 1.0)
-                seasonal_weights.append(base_rating * seasonal_factor)
-
-            # Normalize weights (ensure they sum to 1 for random.choices)
-            total_weighted_rating = sum(seasonal_weights)
-            if total_weighted_rating == 0:
-                product_weights = [1 / len(eligible_products)] * len(
-                    eligible_products
-                )  # Uniform if all weights are 0
-            else:
-                product_weights = [r / total_weighted_rating for r in seasonal_weights]
-
-            rand_product = random.choices(eligible_products, weights=product_weights)[0]
-            # order_items.append({
-            #     "order_id": order["order_id"],
-            #     "product_id": rand_product["product_id"],
-            #     "price": rand_product["price"]
-            # })
-            order_items.append(
-                OrderItem(
-                    order_id=order["order_id"],
-                    product_id=rand_product["product_id"],
-                    price=rand_product["price"],
-                    cost=rand_product["cost"],
-                ).__dict__
+    # Gender of the ordering customer, "f" if the order has none
+    customer_ids = np.ma.asarray(order_columns["customer_id"])
+    known_ids = DataUtils.column_values(customers, "customer_id").astype(np.int64)
+    known_genders = product_sampler.gender_codes(DataUtils.column_values(customers, "gender"))
+    by_id = np.argsort(known_ids)
+    found = np.searchsorted(known_ids[by_id], customer_ids.filled(0))
+    found = np.minimum(found, len(known_ids) - 1)
+    has_customer = ~np.ma.getmaskarray(customer_ids) & (
+        known_ids[by_id][found] == customer_ids.filled(0)
+    )
+    gender_codes = np.where(
+        has_customer, known_genders[by_id][found], product_sampler.gender_codes(["f"])[0]
+    )
+
+    num_of_items = rng.choice(
+        [1, 2, 3, 4, 5], size=len(gender_codes), p=[0.25, 0.45, 0.18, 0.07, 0.05]
+    )
+    order_months = np.asarray(order_columns["order_date"], dtype="datetime64[M]")
+    order_months = order_months.astype(int) % 12 + 1
+
+    n = int(num_of_items.sum())
+    categories = product_sampler.sample_categories(
+        np.repeat(gender_codes, num_of_items), rng
+    )
+    positions = product_sampler.sample_products(
+        categories, np.repeat(order_months, num_of_items), rng
+    )
+    quantity = rng.integers(1, 5, n)
+
+    return ColumnTable({
+        "order_id": np.repeat(np.asarray(order_columns["order_id"]), num_of_items),
+        "product_id": product_sampler.product_id[positions],
+        "order_item_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "quantity": quantity,
+        "price": quantity * product_sampler.price[positions],
+        "cost": quantity * product_sampler.cost[positions],
+    })
+
+
+def generate_orders_and_items(
+    num_of_orders: int,
+    customers,
+    stores: list,
+    products: list,
+    ids: IdAllocator,
+    date_sampler: DateSampler = None,
+    product_sampler: ProductSampler = None,
+    rng: np.random.Generator = None,
+) -> tuple:
+    """Generate a batch of orders and their order items with IDs from `ids`.
+
+    Order IDs are reserved up front; order item IDs once their count is known.
+    """
+    order_columns = generate_orders_batch(
+        num_of_orders=num_of_orders,
+        customers=customers,
+        stores=stores,
+        start_id=ids.reserve("orders", num_of_orders),
+        date_sampler=date_sampler,
+        rng=rng,
+    )
+    order_item_columns = generate_order_items_batch(
+        order_columns=order_columns,
+        products=products,
+        customers=customers,
+        product_sampler=product_sampler,
+        rng=rng,
+    )
+    order_item_columns["order_item_id"] = ids.allocate(
+        "order_items", order_item_columns.num_rows
+    )
+    return order_columns, order_item_columns
+
+
+_shard_inputs = {}
+
+
+def _init_order_shard(customers: list, stores: list, product_sampler: ProductSampler):
+    """Process pool initializer handing the shared inputs to each worker once."""
+    _shard_inputs.update(
+        customers=customers, stores=stores, product_sampler=product_sampler
+    )
+
+
+def _generate_order_shard(
+    num_of_orders: int, start_id: int, date_sampler: DateSampler, seed
+) -> tuple:
+    rng = np.random.default_rng(seed)
+    order_columns = generate_orders_batch(
+        num_of_orders=num_of_orders,
+        customers=_shard_inputs["customers"],
+        stores=_shard_inputs["stores"],
+        start_id=start_id,
+        date_sampler=date_sampler,
+        rng=rng,
+    )
+    order_item_columns = generate_order_items_batch(
+        order_columns=order_columns,
+        products=None,
+        customers=_shard_inputs["customers"],
+        product_sampler=_shard_inputs["product_sampler"],
+        rng=rng,
+    )
+    return order_columns, order_item_columns
+
+
+def order_shard_pool(customers, stores: list, products: list, processes: int):
+    """Process pool for generate_orders_sharded whose workers hold the inputs.
+
+    customers, stores and a ProductSampler are pickled to every worker once,
+    when it starts, so any number of sharded batches can share the pool.
+    """
+    # Deferred: multiprocessing is only needed when GENERATION_PROCESSES > 1
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # The export pipeline's threads are already running, so the workers are
+    # started from a fork server rather than forked from this process
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=_init_order_shard,
+        initargs=(customers, stores, ProductSampler(products)),
+    )
+
+
+def generate_orders_sharded(
+    num_of_orders: int,
+    customers: list,
+    stores: list,
+    products: list,
+    processes: int = GENERATION_PROCESSES,
+    seed: typing.Union[int, np.random.SeedSequence] = GENERATION_SEED,
+    ids: IdAllocator = None,
+    pool: "ProcessPoolExecutor" = None,
+) -> tuple:
+    """Generate orders and their order items on a pool of worker processes.
+
+    The order_date range since CYMBAL_PETS_START_DATE is split into date shards
+    of roughly equal probability mass and orders are spread over them
+    multinomially, which is statistically the same as the single-process path.
+    Every shard gets its own RNG stream spawned from `seed` and a disjoint,
+    contiguous block of order IDs reserved from `ids`. Order item IDs are
+    allocated on merge, once their count is known. Given the `pool` of an
+    earlier order_shard_pool call, the shards run there; otherwise a pool
+    is started for this call only.
+
+    Returns:
+        tuple: (order columns, order item columns), merged in date order.
+    """
+    if pool is None:
+        with order_shard_pool(customers, stores, products, processes) as pool:
+            return generate_orders_sharded(
+                num_of_orders, customers, stores, products, processes, seed, ids, pool
             )
 
-    return order_items
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(processes + 1)
+    shards = DataUtils.enhanced_created_at_sampler(CYMBAL_PETS_START_DATE).split(processes)
+    masses = np.array([mass for _, mass in shards])
+    counts = np.random.default_rng(seeds[0]).multinomial(num_of_orders, masses / masses.sum())
+    if ids is None:
+        ids = IdAllocator()
+    start_ids = ids.reserve_blocks("orders", counts)
+    results = list(
+        pool.map(
+            _generate_order_shard,
+            counts.tolist(),
+            start_ids.tolist(),
+            [sampler for sampler, _ in shards],
+            seeds[1 : len(shards) + 1],
+        )
+    )
+
+    order_columns = DataUtils.concat_columns([orders for orders, _ in results])
+    order_item_columns = DataUtils.concat_columns([items for _, items in results])
+    order_item_columns["order_item_id"] = ids.allocate(
+        "order_items", order_item_columns.num_rows
+    )
+    return order_columns, order_item_columns
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MiB (None if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def generate_orders_chunked(
+    num_of_orders: int,
+    customers,
+    stores: list,
+    products: list,
+    chunk_size: int = ORDER_CHUNK_SIZE,
+    spill_dir: str = SPILL_DIR,
+    processes: int = GENERATION_PROCESSES,
+    ids: IdAllocator = None,
+    pipeline: "ExportPipeline" = None,
+    seed: int = GENERATION_SEED,
+) -> tuple:
+    """Generate orders and their order items `chunk_size` orders at a time.
+
+    Every chunk's orders and items are spilled to Parquet part files right
+    away, so peak memory is set by the chunk size rather than the total
+    number of orders. Chunks draw from the same date distribution and
+    take consecutive ID ranges from `ids`, so the result is the same as one
+    batch. Every chunk gets its own RNG stream spawned from `seed`. Given a
+    `pipeline`, both tables are submitted before the first chunk and
+    exported while the remaining chunks are generated.
+
+    Returns:
+        tuple: (orders SpilledTable, order items SpilledTable), finished.
+    """
+    orders = SpilledTable("orders", tempfile.mkdtemp(prefix="orders_", dir=spill_dir))
+    order_items = SpilledTable(
+        "order_items", tempfile.mkdtemp(prefix="order_items_", dir=spill_dir)
+    )
+    if ids is None:
+        ids = IdAllocator()
+    if pipeline is not None:
+        pipeline.submit("orders", orders)
+        pipeline.submit("order_items", order_items)
+    try:
+        generate_order_chunks(
+            orders,
+            order_items,
+            num_of_orders=num_of_orders,
+            customers=customers,
+            stores=stores,
+            products=products,
+            chunk_size=chunk_size,
+            processes=processes,
+            ids=ids,
+            seed=seed,
+        )
+    except BaseException as e:
+        orders.fail(e)
+        order_items.fail(e)
+        raise
+    orders.finish()
+    order_items.finish()
+    return orders, order_items
+
+
+def generate_order_chunks(
+    orders: SpilledTable,
+    order_items: SpilledTable,
+    num_of_orders: int,
+    customers,
+    stores: list,
+    products: list,
+    chunk_size: int,
+    processes: int,
+    ids: IdAllocator,
+    seed: int = None,
+):
+    """Appends `num_of_orders` orders and their items to the spilled tables.
+
+    With `processes` > 1 every chunk is sharded over one process pool that
+    is started once for all of them.
+    """
+    num_of_chunks = -(-num_of_orders // chunk_size)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(num_of_chunks)
+    with contextlib.ExitStack() as stack:
+        if processes > 1:
+            pool = stack.enter_context(order_shard_pool(customers, stores, products, processes))
+        else:
+            product_sampler = ProductSampler(products)
+        for chunk in range(num_of_chunks):
+            size = min(chunk_size, num_of_orders - orders.num_rows)
+            if processes > 1:
+                order_columns, order_item_columns = generate_orders_sharded(
+                    num_of_orders=size,
+                    customers=customers,
+                    stores=stores,
+                    products=products,
+                    processes=processes,
+                    seed=chunk_seeds[chunk],
+                    ids=ids,
+                    pool=pool,
+                )
+            else:
+                order_columns, order_item_columns = generate_orders_and_items(
+                    num_of_orders=size,
+                    customers=customers,
+                    stores=stores,
+                    products=products,
+                    ids=ids,
+                    product_sampler=product_sampler,
+                    rng=np.random.default_rng(chunk_seeds[chunk]),
+                )
+            orders.append(order_columns)
+            order_items.append(order_item_columns, parents={"orders": order_columns})
+            print(
+                f"Chunk {chunk + 1}/{num_of_chunks}: spilled {size} orders and "
+                f"{order_item_columns.num_rows} order items, peak RSS {peak_rss_mb():.0f} MiB"
+            )
+            del order_columns, order_item_columns
 
 
-def generate_employees(num_of_employees: int = None):
+def generate_employees(num_of_employees: int = None, start_id: int = ID_START["employees"]):
     employees = []
-    for _ in range(num_of_employees):
-        employees.append(Employee().__dict__)
+    for employee_id in range(start_id, start_id + num_of_employees):
+        employees.append(Employee(employee_id=employee_id).__dict__)
     return employees
 
 
-def generate_customer_service(customers: list, num_of_customer_services: int):
-    customer_service = []
-    for _ in range(num_of_customer_services):
-        rand_cust = random.choice(customers)
-        customer_service.append(
-            CustomerService(
-                customer_id=rand_cust["customer_id"],
-            ).__dict__
+def generate_customer_service(
+    customers: list, num_of_customer_services: int, start_id: int = 1
+):
+    return DataUtils.columns_to_records(
+        generate_customer_service_batch(
+            customers=customers,
+            num_of_customer_services=num_of_customer_services,
+            start_id=start_id,
         )
-    return customer_service
+    )
+
+
+def generate_customer_service_batch(
+    customers: list,
+    num_of_customer_services: int,
+    start_id: int = 1,
+    rng: np.random.Generator = None,
+    text_mode: str = TEXT_MODE,
+    bucket_name: str = None,
+) -> dict:
+    """Generate customer service cases column-wise, with notes from the sentence bank.
+
+    Returns:
+        ColumnTable: customer_id, case_id, case_type, case_status,
+            resolution_notes and agent_id columns.
+    """
+    if rng is None:
+        rng = np_rng
+    n = num_of_customer_services
+    customer_ids = DataUtils.column_values(customers, "customer_id").astype(np.int64)
+    case_type = CategoricalColumn(
+        rng.choice(len(CASE_TYPE_WEIGHTS), size=n, p=_probabilities(CASE_TYPE_WEIGHTS)),
+        list(CASE_TYPE_WEIGHTS),
+    )
+    sentence_bank = get_sentence_bank(bucket_name)
+    resolution_notes = sentence_bank.sample(np.asarray(case_type), text_mode, rng=rng)
+    print(f"resolution_notes uses {sentence_bank.distinct_emitted} distinct sentences so far")
+
+    return ColumnTable({
+        "customer_id": customer_ids[rng.integers(0, len(customer_ids), n)],
+        "case_id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "case_type": case_type,
+        "case_status": CategoricalColumn(
+            rng.choice(len(CASE_STATUS_WEIGHTS), size=n, p=_probabilities(CASE_STATUS_WEIGHTS)),
+            list(CASE_STATUS_WEIGHTS),
+        ),
+        "resolution_notes": resolution_notes,
+        "agent_id": rng.integers(1, 8, n),
+    })
 
 
 def generate_nutrition_agent(products: list):
@@ -857,171 +3069,1034 @@ def generate_nutrition_agent(products: list):
     return nutrition_information
 
 
+def validate_tables(
+    data_list: dict, reference: dict = None, parent_keys: dict = None, quiet: bool = False
+) -> dict:
+    """Checks foreign keys and REQUIRED columns before the tables are loaded.
+
+    Every FOREIGN_KEYS column of a table in `data_list` must only hold IDs of
+    its parent table, looked up in `data_list` and then in `reference`
+    (tables that are already loaded and are not exported again); checks
+    whose parent is absent are skipped. Every REQUIRED column of the
+    table's schema must be present and have no missing values, and every
+    column must be in the schema. Only the ID columns are read back from
+    spilled tables. Pass the same `parent_keys` dict to calls that share
+    parent tables to read their keys only once.
+
+    Returns:
+        dict: Rows and foreign-key checks performed.
+
+    Raises:
+        ValueError: Listing every violation found.
+    """
+    tables = {**(reference or {}), **data_list}
+    if parent_keys is None:
+        parent_keys = {}
+    errors = []
+    rows = checks = 0
+
+    def keys_of(table_name, column_name):
+        if (table_name, column_name) not in parent_keys:
+            parent_keys[table_name, column_name] = np.concatenate([
+                DataUtils.key_values(chunk[column_name])
+                for chunk in DataUtils.column_chunks(tables[table_name], [column_name])
+            ] or [np.empty(0, dtype=np.int64)])
+        return parent_keys[table_name, column_name]
+
+    for name, data in data_list.items():
+        rows += DataUtils.num_rows(data)
+        schema = DataHandling.read_schema(name)
+        schema_columns = {column["name"] for column in schema}
+        required = [column["name"] for column in schema if column.get("mode") == "REQUIRED"]
+        if isinstance(data, SpilledTable):
+            import pyarrow.parquet as pq
+
+            columns = pq.read_schema(data.parts[0]).names if data.parts else required
+        elif isinstance(data, dict):
+            columns = list(data)
+        else:
+            columns = list(data[0]) if data else required
+        unknown = [column for column in columns if column not in schema_columns]
+        if unknown:
+            errors.append(f"{name}: columns not in the schema: {', '.join(unknown)}")
+        absent = [column for column in required if column not in columns]
+        if absent:
+            errors.append(f"{name}: REQUIRED columns missing: {', '.join(absent)}")
+
+        foreign_keys = {
+            column: parent
+            for column, parent in FOREIGN_KEYS.get(name, {}).items()
+            if parent[0] in tables and column in columns
+        }
+        present = [column for column in required if column in columns]
+        nulls = dict.fromkeys(present, 0)
+        missing = {column: [] for column in foreign_keys}
+        for chunk in DataUtils.column_chunks(data, sorted(set(present) | set(foreign_keys))):
+            for column in present:
+                nulls[column] += DataUtils.null_count(chunk[column])
+            for column, (parent, parent_column) in foreign_keys.items():
+                missing[column].append(
+                    DataUtils.missing_keys(
+                        DataUtils.key_values(chunk[column]), keys_of(parent, parent_column)
+                    )
+                )
+        for column, count in nulls.items():
+            if count:
+                errors.append(f"{name}.{column}: {count} missing values in a REQUIRED column")
+        for column, parts in missing.items():
+            checks += 1
+            unknown_ids = np.unique(np.concatenate(parts)) if parts else []
+            if len(unknown_ids):
+                parent, parent_column = foreign_keys[column]
+                errors.append(
+                    f"{name}.{column}: {len(unknown_ids)} IDs not in {parent}.{parent_column}, "
+                    f"e.g. {unknown_ids[:5].tolist()}"
+                )
+
+    if errors:
+        raise ValueError("Validation failed:\n" + "\n".join(errors))
+    if not quiet:
+        print(f"Validated {rows} rows: {checks} foreign keys and REQUIRED columns OK")
+    return {"rows": rows, "foreign_keys": checks}
+
+
+class ExportPipeline:
+    """Validates and stages tables while the next ones are generated, then loads them.
+
+    submit() puts a table on a bounded queue, blocking while
+    `max_pending` tables are already waiting, so generation never runs far
+    ahead of the exporters. Exporter threads validate each table against
+    the tables submitted before it (and `reference`), then serialize and
+    stage it through `sink` (for GCS, upload it to the bucket). Wall time
+    thus tends to the slowest of generation and upload rather than their
+    sum.
+
+    No load job starts before close(), once every table has been generated,
+    validated and staged, so a failed run leaves the BigQuery tables as the
+    last successful run left them. close() then calls `before_load` with the
+    staged tables (e.g. to record them in the manifest), starts all the
+    loads and polls them together. With a `job_id_prefix`, every table's
+    load job ID is the prefix plus the table name, so retrying the loads
+    does not load any table twice.
+
+    A SpilledTable still being generated is exported part by part as it
+    grows; its chunks are validated as they are appended instead, against
+    the tables that are complete.
+
+    The first failure stops the pipeline: tables still queued are dropped,
+    nothing is loaded and the error is raised by the next submit() or by
+    close().
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        output_format: str = "json",
+        max_workers: int = EXPORT_WORKERS,
+        max_pending: int = EXPORT_QUEUE_TABLES,
+        object_prefix: str = "",
+        write_disposition: str = WRITE_TRUNCATE,
+        reference: dict = None,
+        validate: bool = True,
+        job_id_prefix: str = None,
+        before_load: typing.Callable = None,
+    ):
+        self.sink = sink
+        self.max_workers = max_workers
+        self.output_format = output_format
+        self.object_prefix = object_prefix
+        self.write_disposition = write_disposition
+        self.reference = reference or {}
+        self.validate = validate
+        self.job_id_prefix = job_id_prefix
+        self.before_load = before_load
+        self.tables = {}
+        self.staged = {}
+        self.stats = {}
+        self.parent_keys = {}
+        self.errors = []
+        self.closed = False
+        self.started = time.perf_counter()
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.exporters = [
+            threading.Thread(target=self.export, name=f"export-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self.exporters:
+            thread.start()
+
+    def submit(self, name: str, data):
+        """Queues a table for export, waiting while the queue is full."""
+        if self.errors:
+            raise self.errors[0]
+        self.tables[name] = data
+        self.stats[name] = {"table": name, "rows": DataUtils.num_rows(data)}
+        if self.validate and self.streaming(data):
+            data.checks.append(functools.partial(self.validate_chunk, name))
+        self.pending.put((name, data))
+
+    @staticmethod
+    def streaming(data) -> bool:
+        return isinstance(data, SpilledTable) and not data.finished
+
+    def validate_chunk(self, name: str, columns: dict, parents: dict):
+        """Checks one chunk of a streamed table before it is written.
+
+        Foreign keys to complete tables are checked against the whole
+        table; foreign keys to a table that is still being generated
+        against its matching chunk in `parents`, which must be given.
+        """
+        start = time.perf_counter()
+        reference = {
+            table: data
+            for table, data in {**self.reference, **self.tables}.items()
+            if not self.streaming(data)
+        }
+        unchecked = [
+            f"{name}.{column} -> {parent}"
+            for column, (parent, _) in FOREIGN_KEYS.get(name, {}).items()
+            if parent in self.tables and parent not in reference and parent not in parents
+        ]
+        if unchecked:
+            raise ValueError(
+                "Validation failed:\n"
+                + "\n".join(f"{check}: no matching parent chunk given" for check in unchecked)
+            )
+        # Keys of whole tables are cached across chunks, those of parent chunks are not
+        parent_keys = dict(self.parent_keys)
+        validate_tables(
+            {name: columns}, reference={**reference, **parents}, parent_keys=parent_keys, quiet=True
+        )
+        self.parent_keys.update(
+            (key, values) for key, values in parent_keys.items() if key[0] not in parents
+        )
+        stats = self.stats[name]
+        stats["validate_seconds"] = stats.get("validate_seconds", 0) + time.perf_counter() - start
+
+    def export(self):
+        while (item := self.pending.get()) is not None:
+            if self.errors:
+                continue
+            name, data = item
+            try:
+                if self.validate and not self.streaming(data):
+                    start = time.perf_counter()
+                    validate_tables({name: data}, reference={**self.reference, **self.tables})
+                    self.stats[name]["validate_seconds"] = time.perf_counter() - start
+                start = time.perf_counter()
+                staged, num_bytes, raw_bytes = self.sink.stage(
+                    data_name=name,
+                    data_list=data,
+                    output_format=self.output_format,
+                    object_name=self.object_prefix + name,
+                )
+                self.staged[name] = staged
+                stats = self.stats[name]
+                stats.update(
+                    rows=DataUtils.num_rows(data),
+                    bytes=num_bytes,
+                    upload_seconds=time.perf_counter() - start,
+                )
+                if raw_bytes != num_bytes:
+                    stats["uncompressed_bytes"] = raw_bytes
+                    stats["compression_ratio"] = round(raw_bytes / max(num_bytes, 1), 2)
+            except Exception as e:
+                self.errors.append(e)
+
+    def start_load(self, name: str) -> tuple:
+        started = time.perf_counter()
+        load_job = self.sink.load(
+            data_name=name,
+            staged=self.staged.pop(name),
+            output_format=self.output_format,
+            write_disposition=self.write_disposition,
+            job_id=self.job_id_prefix and self.job_id_prefix + name,
+        )
+        return load_job, started
+
+    def load(self):
+        """Starts the load job of every staged table and waits for them all."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="load") as pool:
+            futures = {name: pool.submit(self.start_load, name) for name in list(self.staged)}
+        loads = {}
+        for name, future in futures.items():
+            try:
+                loads[name] = future.result()
+            except Exception as e:
+                self.errors.append(e)
+        while loads:
+            for name, (load_job, load_started) in list(loads.items()):
+                try:
+                    if not load_job.done():
+                        continue
+                    del loads[name]
+                    load_job.result()
+                    DataHandling.report_load(name, load_job)
+                except Exception as e:
+                    loads.pop(name, None)
+                    self.errors.append(e)
+                    continue
+                stats = self.stats[name]
+                stats["load_seconds"] = time.perf_counter() - load_started
+                stats["load_job_seconds"] = DataHandling.load_job_seconds(load_job)
+                stats["wall_seconds"] = time.perf_counter() - self.started
+            if loads:
+                time.sleep(LOAD_POLL_INTERVAL)
+
+    def close(self, abort: bool = False) -> list:
+        """Waits for every submitted table to be staged, loads them and returns their stats.
+
+        The loads only start if every table was validated and staged. With
+        `abort`, queued tables are dropped, nothing is loaded and errors are
+        not raised; closing twice does nothing.
+
+        Returns:
+            list: One dict per table with its row count, bytes written and
+            timings in seconds (load_job_seconds is BigQuery's own duration,
+            if known). Compressed exports also get uncompressed_bytes and
+            compression_ratio.
+        """
+        if self.closed:
+            return list(self.stats.values())
+        self.closed = True
+        if abort:
+            self.errors.append(RuntimeError("Export pipeline aborted"))
+            for data in self.tables.values():
+                if self.streaming(data):
+                    data.fail(self.errors[-1])
+        for _ in self.exporters:
+            self.pending.put(None)
+        for thread in self.exporters:
+            thread.join()
+        if not self.errors and self.before_load is not None:
+            try:
+                self.before_load(dict(self.staged))
+            except Exception as e:
+                self.errors.append(e)
+        if not self.errors:
+            self.load()
+        for staged in self.staged.values():
+            self.sink.discard(staged)
+        self.staged.clear()
+        if abort:
+            return list(self.stats.values())
+        if self.errors:
+            raise self.errors[0]
+
+        for table in self.stats.values():
+            print(
+                f"Exported {table['rows']} rows to {table['table']} in "
+                f"{table['wall_seconds']:.1f}s (upload {table['upload_seconds']:.1f}s, "
+                f"load {table['load_seconds']:.1f}s)"
+                + (
+                    f", {table['compression_ratio']}x compressed"
+                    if "compression_ratio" in table
+                    else ""
+                )
+            )
+        return list(self.stats.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(abort=exc_type is not None)
+
+
+def export_tables(
+    data_list: dict,
+    sink: Sink,
+    output_format: str = "json",
+    max_workers: int = EXPORT_WORKERS,
+    object_prefix: str = "",
+    write_disposition: str = WRITE_TRUNCATE,
+    reference: dict = None,
+    validate: bool = True,
+    job_id_prefix: str = None,
+    before_load: typing.Callable = None,
+) -> list:
+    """Validates and exports every table through `sink` and waits for the loads.
+
+    The tables go through an ExportPipeline, so exports run on a bounded set
+    of threads, no load job starts before every table is staged, and the
+    load jobs are polled together instead of blocking on each one in turn.
+
+    Args:
+        data_list (dict): Table name -> records or dict of column arrays.
+        sink (Sink): Where the tables are written and loaded from.
+        output_format (str): One of OUTPUT_FORMATS.
+        max_workers (int): Maximum number of concurrent exports.
+        object_prefix (str): Prefix of the exported object names.
+        write_disposition (str): BigQuery write disposition of the load jobs.
+        reference (dict): Tables the foreign keys may point to that are not
+            exported again.
+        validate (bool): Check every table with validate_tables first.
+        job_id_prefix (str): Load job ID prefix making the loads idempotent.
+        before_load (callable): Called with the staged tables before any load.
+
+    Returns:
+        list: ExportPipeline.close()'s per-table stats.
+    """
+    with ExportPipeline(
+        sink,
+        output_format=output_format,
+        max_workers=max_workers,
+        max_pending=len(data_list) or 1,
+        object_prefix=object_prefix,
+        write_disposition=write_disposition,
+        reference=reference,
+        validate=validate,
+        job_id_prefix=job_id_prefix,
+        before_load=before_load,
+    ) as pipeline:
+        for name, data in data_list.items():
+            pipeline.submit(name, data)
+        return pipeline.close()
+
+
+class Telemetry:
+    """Wall time, CPU time, rows, throughput and memory per stage of a run.
+
+    A stage's thread_cpu_seconds and rss_delta_mb are its own: CPU time of
+    the thread running it, and the change in resident memory over it.
+    process_cpu_seconds also counts the exporter and compression threads
+    working meanwhile, and process_peak_rss_mb is the peak of the whole
+    process so far, not of the stage.
+
+    Every finished stage, and every exported table, is printed as one JSON
+    log line (Cloud Logging turns these into structured entries), and
+    `summary()` collects them for the hello_http response.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.tables = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block; set record["rows"] / ["bytes"] inside it."""
+        record = {"stage": name}
+        wall, cpu, process_cpu = time.perf_counter(), time.thread_time(), time.process_time()
+        rss = rss_mb()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - wall, 3)
+            record["thread_cpu_seconds"] = round(time.thread_time() - cpu, 3)
+            record["process_cpu_seconds"] = round(time.process_time() - process_cpu, 3)
+            if record.get("rows") is not None and record["wall_seconds"] > 0:
+                record["rows_per_sec"] = round(record["rows"] / record["wall_seconds"])
+            end_rss = rss_mb()
+            if rss is not None and end_rss is not None:
+                record["rss_delta_mb"] = round(end_rss - rss, 1)
+            record["process_peak_rss_mb"] = round(peak_rss_mb())
+            self.stages.append(record)
+            self.log("stage", record)
+
+    def record_exports(self, stats: list) -> dict:
+        """Adds export_tables' per-table stats and returns their total rows and bytes."""
+        for table in stats:
+            self.tables.append(table)
+            self.log("table", table)
+        return {
+            "rows": sum(table["rows"] for table in stats),
+            "bytes": sum(table.get("bytes") or 0 for table in stats),
+        }
+
+    def log(self, kind: str, record: dict):
+        name = record.get("stage") or record.get("table")
+        print(
+            json.dumps(
+                {"severity": "INFO", "message": f"{kind} {name}", **record},
+                default=DataHandling.serialize,
+            )
+        )
+
+    def summary(self) -> dict:
+        return {
+            "status": "ok",
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "process_peak_rss_mb": round(peak_rss_mb()),
+            "stages": self.stages,
+            "tables": self.tables,
+        }
+
+
+@contextlib.contextmanager
+def profiled(profiler: str = None):
+    """Profiles the enclosed block with "cprofile" or "pyinstrument" (if installed).
+
+    The report is printed when the block ends. Anything else runs unprofiled.
+    """
+    if profiler == "cprofile":
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            pstats.Stats(profile).sort_stats("cumulative").print_stats(40)
+    elif profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("PROFILER=pyinstrument but pyinstrument is not installed, not profiling")
+            yield
+            return
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            print(profile.output_text(unicode=False, color=False))
+    else:
+        yield
+
+
 # ==================================================================================
 
 
 def main(
     num_of_customers: int,
     daily_orders: int,
-):
-    print("Generating location data")
-    location_data = generate_location_data("USA")
-    print("Generated geo data for " + str(len(location_data)) + " country successfully")
-    print("Generating products data")
-    products = generate_products()
-    print("Generated " + str(len(products)) + " products data successfully")
-    print("Generating stores data")
-    stores = generate_stores(geo_data=location_data)
-    print("Generated " + str(len(stores)) + " stores data successfully")
-    print("Generating suppliers data")
-    suppliers = generate_suppliers(geo_data=location_data)
-    print("Generated " + str(len(suppliers)) + " suppliers data successfully")
-    print("Generating distribution center data")
-    distribution_centers = generate_distribution_centers()
-    print(
-        "Generated "
-        + str(len(distribution_centers))
-        + " distribution centers data successfully"
-    )
-    print("Generating customers data")
-    customers = generate_customers(
-        num_of_customers=num_of_customers, geo_data=location_data
-    )
-    num_of_employees = len(stores) * 7
-    print("Generating employees data")
-    employees = generate_employees(num_of_employees=num_of_employees)
-    print("Generated " + str(len(employees)) + " employees data successfully")
-    print("Generating nutritional data")
-    nutritional_data = generate_nutrition_agent(products=products)
-    print("Generated " + str(len(nutritional_data)) + " nutritional data successfully")
-    print("Generated " + str(len(customers)) + " customers data successfully")
-    print("Generating pet profiles data")
-    pet_profiles = generate_pet_profiles(
-        customers=customers, num_of_pet_profiles=(round(len(customers) / 12))
-    )
-    print("Generated " + str(len(pet_profiles)) + " pet profiles data successfully")
-    print("Generating customer service data")
-    num_of_customer_services = round(len(customers) / 44)
-    customer_service = generate_customer_service(
-        customers=customers, num_of_customer_services=num_of_customer_services
+    mode: str = GENERATION_MODE,
+    sink: Sink = None,
+    telemetry: "Telemetry" = None,
+    config: "Config" = None,
+) -> dict:
+    """Generates and exports the dataset; returns the run's telemetry summary.
+
+    Every other setting comes from `config` (the defaults if not given).
+    """
+    if config is None:
+        config = Config(num_of_customers=num_of_customers, daily_orders=daily_orders)
+    if sink is None:
+        sink = get_sink(config)
+    if telemetry is None:
+        telemetry = Telemetry()
+    ids = IdAllocator()
+    if mode == "incremental":
+        manifest = sink.read_manifest()
+        if manifest is not None:
+            return main_incremental(
+                daily_orders=daily_orders,
+                manifest=manifest,
+                sink=sink,
+                config=config,
+                telemetry=telemetry,
+            )
+        print("No manifest found, generating the full history")
+
+    reference = ReferenceData(
+        source=config.reference_source,
+        bucket_name=config.bucket_name,
+        directory=config.local_data_dir,
     )
-    print(
-        "Generated "
-        + str(len(customer_service))
-        + " customer services data successfully"
+    # Every table is validated and staged on the pipeline's threads while the
+    # next one is generated; the loads start once all of them are staged
+    pipeline = ExportPipeline(
+        sink,
+        max_workers=config.export_workers,
+        max_pending=config.export_queue_tables,
+        output_format=config.output_format,
     )
-    print("Generating orders and order items")
-    # store_count = len(stores)
-    # customer_count = len(customers)
-    orders = []
-    num_of_orders = (date.today() - CYMBAL_PETS_START_DATE).days * round(daily_orders)
-    # for _ in range(num_of_orders):
-    #     has_customer_id = random.choices([True, False], weights=[0.67, 0.33])[0]
-    #     rand_store = random.randint(0, store_count - 1)
-    #     if has_customer_id:
-    #         rand_cust = random.randint(0, customer_count - 1)
-    #         customer_id = customers[rand_cust]["customer_id"]
-    #         address_city = customers[rand_cust]["address_city"]
-    #     else:
-    #         customer_id = None
-    #         address_city = None
-    #     orders.extend(
-    #         generate_orders(
-    #             customer_id=customer_id,
-    #             address_city=address_city,
-    #             store_id=stores[rand_store]["store_id"],
-    #         )
-    #     )
-    # order_items = generate_order_items(
-    #     orders=orders, products=products, customers=customers
-    # )
-
-    store_count = len(stores)
-    customer_count = len(customers)
-
-    for has_customer_id in random.choices(
-        [True, False], weights=[0.67, 0.33], k=num_of_orders
-    ):
-        rand_store = random.randint(0, store_count - 1)
+    try:
+        print("Generating location data")
+        with telemetry.stage("location_data") as stage:
+            location_data, geo_index = reference.get("location_data")
+            stage["rows"] = len(geo_index)
+        print("Generated geo data for " + str(len(location_data)) + " country successfully")
+        print("Generating products data")
+        with telemetry.stage("products") as stage:
+            products = reference.get("products_data")
+            stage["rows"] = len(products)
+        print("Generated " + str(len(products)) + " products data successfully")
+        pipeline.submit("products", products)
+        print("Generating stores data")
+        with telemetry.stage("stores") as stage:
+            stores = generate_stores(
+                geo_data=location_data, geo_index=geo_index, store_data=reference.get("stores_data")
+            )
+            stage["rows"] = len(stores)
+        print("Generated " + str(len(stores)) + " stores data successfully")
+        pipeline.submit("stores", stores)
+        print("Generating suppliers data")
+        with telemetry.stage("suppliers") as stage:
+            suppliers = generate_suppliers(
+                geo_data=location_data,
+                geo_index=geo_index,
+                supplier_data=reference.get("suppliers_data"),
+            )
+            stage["rows"] = len(suppliers)
+        print("Generated " + str(len(suppliers)) + " suppliers data successfully")
+        pipeline.submit("suppliers", suppliers)
+        print("Generating distribution center data")
+        with telemetry.stage("distribution_centers") as stage:
+            distribution_centers = reference.get("distribution_centers_data")
+            stage["rows"] = len(distribution_centers)
+        print(
+            "Generated "
+            + str(len(distribution_centers))
+            + " distribution centers data successfully"
+        )
+        pipeline.submit("distribution_centers", distribution_centers)
+        print("Generating customers data")
+        with telemetry.stage("customers") as stage:
+            customers = generate_customers_batch(
+                num_of_customers=num_of_customers,
+                geo_data=location_data,
+                geo_index=geo_index,
+                start_id=ids.reserve("customers", num_of_customers),
+            )
+            stage["rows"] = customers.num_rows
+        pipeline.submit("customers", customers)
+        num_of_employees = len(stores) * 7
+        print("Generating employees data")
+        with telemetry.stage("employees") as stage:
+            employees = generate_employees(
+                num_of_employees=num_of_employees,
+                start_id=ids.reserve("employees", num_of_employees),
+            )
+            stage["rows"] = len(employees)
+        print("Generated " + str(len(employees)) + " employees data successfully")
+        pipeline.submit("employees", employees)
+        print("Generating nutritional data")
+        with telemetry.stage("nutritional_data") as stage:
+            nutritional_data = generate_nutrition_agent(products=products)
+            stage["rows"] = len(nutritional_data)
+        print("Generated " + str(len(nutritional_data)) + " nutritional data successfully")
+        pipeline.submit("nutritional_data", nutritional_data)
+        print("Generated " + str(customers.num_rows) + " customers data successfully")
+        print("Generating pet profiles data")
+        with telemetry.stage("pet_profiles") as stage:
+            num_of_pet_profiles = round(customers.num_rows / 12)
+            pet_profiles = generate_pet_profiles_batch(
+                customers=customers,
+                num_of_pet_profiles=num_of_pet_profiles,
+                start_id=ids.reserve("pet_profiles", num_of_pet_profiles),
+                text_mode=config.text_mode,
+                bucket_name=config.bucket_name,
+            )
+            stage["rows"] = pet_profiles.num_rows
+        print("Generated " + str(pet_profiles.num_rows) + " pet profiles data successfully")
+        pipeline.submit("pet_profiles", pet_profiles)
+        print("Generating customer service data")
+        num_of_customer_services = round(customers.num_rows / 44)
+        with telemetry.stage("customer_service") as stage:
+            customer_service = generate_customer_service_batch(
+                customers=customers,
+                num_of_customer_services=num_of_customer_services,
+                start_id=ids.reserve("customer_service", num_of_customer_services),
+                text_mode=config.text_mode,
+                bucket_name=config.bucket_name,
+            )
+            stage["rows"] = customer_service.num_rows
+        print(
+            "Generated "
+            + str(customer_service.num_rows)
+            + " customer services data successfully"
+        )
+        pipeline.submit("customer_service", customer_service)
+        print("Generating orders and order items")
+        # store_count = len(stores)
+        # customer_count = len(customers)
+        num_of_orders = (date.today() - CYMBAL_PETS_START_DATE).days * round(daily_orders)
+        # for _ in range(num_of_orders):
+        #     has_customer_id = random.choices([True, False], weights=[0.67, 0.33])[0]
+        #     rand_store = random.randint(0, store_count - 1)
+        #     if has_customer_id:
+        #         rand_cust = random.randint(0, customer_count - 1)
+        #         customer_id = customers[rand_cust]["customer_id"]
+        #         address_city = customers[rand_cust]["address_city"]
+        #     else:
+        #         customer_id = None
+        #         address_city = None
+        #     orders.extend(
+        #         generate_orders(
+        #             customer_id=customer_id,
+        #             address_city=address_city,
+        #             store_id=stores[rand_store]["store_id"],
+        #         )
+        #     )
+        # order_items = generate_order_items(
+        #     orders=orders, products=products, customers=customers
+        # )
 
-        if has_customer_id:
-            rand_cust = random.randint(0, customer_count - 1)
-            customer_id = customers[rand_cust]["customer_id"]
-            address_city = customers[rand_cust]["address_city"]
-        else:
-            customer_id, address_city = None, None
-        orders.extend(
-            generate_orders(
-                customer_id=customer_id,
-                address_city=address_city,
-                store_id=stores[rand_store]["store_id"],
+        with telemetry.stage("orders_and_order_items") as stage:
+            chunk_size = config.order_chunk_size
+            if chunk_size and num_of_orders > chunk_size:
+                order_columns, order_item_columns = generate_orders_chunked(
+                    num_of_orders=num_of_orders,
+                    customers=customers,
+                    stores=stores,
+                    products=products,
+                    chunk_size=chunk_size,
+                    spill_dir=config.spill_dir,
+                    processes=config.generation_processes,
+                    ids=ids,
+                    pipeline=pipeline,
+                    seed=config.generation_seed,
+                )
+            elif config.generation_processes > 1:
+                order_columns, order_item_columns = generate_orders_sharded(
+                    num_of_orders=num_of_orders,
+                    customers=customers,
+                    stores=stores,
+                    products=products,
+                    processes=config.generation_processes,
+                    seed=config.generation_seed,
+                    ids=ids,
+                )
+            else:
+                order_columns, order_item_columns = generate_orders_and_items(
+                    num_of_orders=num_of_orders,
+                    customers=customers,
+                    stores=stores,
+                    products=products,
+                    ids=ids,
+                    rng=np.random.default_rng(config.generation_seed),
+                )
+            stage["rows"] = DataUtils.num_rows(order_columns) + DataUtils.num_rows(
+                order_item_columns
+            )
+        print(
+            "Generated "
+            + str(DataUtils.num_rows(order_columns))
+            + " orders and "
+            + str(DataUtils.num_rows(order_item_columns))
+            + " order items successfully"
+        )
+        if "orders" not in pipeline.tables:
+            pipeline.submit("orders", order_columns)
+            pipeline.submit("order_items", order_item_columns)
+        print("Generate purchase order data")
+        num_of_purchase_orders = (date.today() - CYMBAL_PETS_START_DATE).days * 3
+        with telemetry.stage("purchase_orders") as stage:
+            purchase_orders = generate_purchase_order_data(
+                num_of_purchase_orders=num_of_purchase_orders,
+                products=products,
+                suppliers=suppliers,
+                distribution_centers=distribution_centers,
+                start_id=ids.reserve("purchase_orders", num_of_purchase_orders),
             )
+            stage["rows"] = purchase_orders.num_rows
+        print(
+            "Generated " + str(purchase_orders.num_rows) + " purchase orders data successfully"
         )
-    # orders.extend(
-    #     repeat(
-    #         generate_orders(
-    #             customer_id=customer_id,
-    #             address_city=address_city,
-    #             store_id=stores[rand_store]["store_id"],
-    #         ),
-    #         1,
-    #     )
-    # )
-
-    order_items = generate_order_items(
-        orders=orders, products=products, customers=customers
+        pipeline.submit("purchase_orders", purchase_orders)
+        # Time spent waiting for the uploads still running after generation,
+        # then for the load jobs
+        with telemetry.stage("export") as stage:
+            stage.update(telemetry.record_exports(pipeline.close()))
+    finally:
+        pipeline.close(abort=True)
+        for data in pipeline.tables.values():
+            if isinstance(data, SpilledTable):
+                data.cleanup()
+    print(f"Peak RSS {peak_rss_mb():.0f} MiB")
+    sink.write_manifest(
+        DataHandling.build_manifest(ids, last_order_date=date.today() - timedelta(days=1)),
     )
+    print("Cymbal Pets Dataset generation successfully completed!")
+    return telemetry.summary()
 
-    print(
-        "Generated "
-        + str(len(orders))
-        + " orders and "
-        + str(len(order_items))
-        + " order items successfully"
-    )
-    print("Generate purchase order data")
-    num_of_purchase_orders = (date.today() - CYMBAL_PETS_START_DATE).days * 3
-    purchase_orders = generate_purchase_order_data(
-        num_of_purchase_orders=num_of_purchase_orders,
-        products=products,
-        suppliers=suppliers,
-        distribution_centers=distribution_centers,
-    )
-    print(
-        "Generated " + str(len(purchase_orders)) + " purchase orders data successfully"
+
+def main_incremental(
+    daily_orders: int,
+    manifest: dict,
+    sink: Sink,
+    config: "Config",
+    telemetry: "Telemetry" = None,
+) -> dict:
+    """Appends only the days generated since the manifest's last_order_date.
+
+    Orders, order items, purchase orders and customer service cases for the
+    missing days are generated against the customers and stores of the last
+    full run, continue the ID sequences from the manifest's high-water marks
+    and are loaded with WRITE_APPEND. Orders and purchase orders per day
+    follow the same enhanced_created_at density as a full run, so the daily
+    volume continues without a step at the boundary.
+
+    Appending is made retry-safe: once every table is staged, the manifest
+    is advanced past the new days and records the staged tables under
+    "loading" before any load starts, and the loads use job IDs derived
+    from it. A run finding "loading" in the manifest first finishes those
+    loads (resume_loads) instead of generating the days again.
+    """
+    if telemetry is None:
+        telemetry = Telemetry()
+    output_format = config.output_format
+    if manifest.get("loading"):
+        with telemetry.stage("resume_loads"):
+            resume_loads(sink, manifest["loading"])
+        del manifest["loading"]
+        sink.write_manifest(manifest)
+    first_day = manifest["last_order_date"] + timedelta(days=1)
+    last_day = date.today() - timedelta(days=1)
+    num_of_days = (last_day - first_day).days + 1
+    if num_of_days <= 0:
+        print(f"Already generated through {manifest['last_order_date']}, nothing to do")
+        return telemetry.summary()
+    print(f"Generating {num_of_days} missing day(s) from {first_day} to {last_day}")
+
+    ids = IdAllocator(manifest["high_water"])
+    # The missing days get the orders a full run ending today would give them:
+    # its enhanced_created_at density over the whole history, so daily volume
+    # carries on from where the last run left off
+    history_days = (date.today() - CYMBAL_PETS_START_DATE).days
+    date_sampler, mass = DataUtils.enhanced_created_at_sampler(
+        CYMBAL_PETS_START_DATE, end_date=date.today()
+    ).window(first_day, last_day)
+    num_of_orders = int(np_rng.poisson(history_days * round(daily_orders) * mass))
+    num_of_purchase_orders = int(np_rng.poisson(history_days * 3 * mass))
+    reference = ReferenceData(
+        source=config.reference_source,
+        bucket_name=config.bucket_name,
+        directory=config.local_data_dir,
+        country_iso3=None,
+        file_names=("products_data", "distribution_centers_data"),
     )
+    with telemetry.stage("read_previous_run") as stage:
+        customers = sink.read_exported("customers", output_format)
+        stores = sink.read_exported("stores", output_format)
+        suppliers = sink.read_exported("suppliers", output_format)
+        stage["rows"] = len(customers) + len(stores) + len(suppliers)
+    products = reference.get("products_data")
+    distribution_centers = reference.get("distribution_centers_data")
+
+    with telemetry.stage("orders_and_order_items") as stage:
+        order_columns, order_item_columns = generate_orders_and_items(
+            num_of_orders=num_of_orders,
+            customers=customers,
+            stores=stores,
+            products=products,
+            ids=ids,
+            date_sampler=date_sampler,
+        )
+        stage["rows"] = order_columns.num_rows + order_item_columns.num_rows
+    with telemetry.stage("purchase_orders") as stage:
+        purchase_orders = generate_purchase_order_data(
+            num_of_purchase_orders=num_of_purchase_orders,
+            products=products,
+            suppliers=suppliers,
+            distribution_centers=distribution_centers,
+            start_id=ids.reserve("purchase_orders", num_of_purchase_orders),
+            date_sampler=date_sampler,
+        )
+        stage["rows"] = purchase_orders.num_rows
+    # Full runs create round(customers / 44) cases over the whole history
+    num_of_customer_services = int(np_rng.poisson(len(customers) / 44 * num_of_days / history_days))
+    with telemetry.stage("customer_service") as stage:
+        customer_service = generate_customer_service_batch(
+            customers=customers,
+            num_of_customer_services=num_of_customer_services,
+            start_id=ids.reserve("customer_service", num_of_customer_services),
+            text_mode=config.text_mode,
+            bucket_name=config.bucket_name,
+        )
+        stage["rows"] = customer_service.num_rows
+
     data_list = {
-        "products": products,
-        "stores": stores,
-        "suppliers": suppliers,
-        "customers": customers,
-        "orders": orders,
-        "order_items": order_items,
-        "customer_service": customer_service,
-        "nutritional_data": nutritional_data,
-        "employees": employees,
-        "pet_profiles": pet_profiles,
-        "distribution_centers": distribution_centers,
+        "orders": order_columns,
+        "order_items": order_item_columns,
         "purchase_orders": purchase_orders,
+        "customer_service": customer_service,
     }
-    for name, data in data_list.items():
-        file_name = f"{name}.json"
-        DataHandling.json_to_gcs(
-            bucket_name=BUCKET_NAME,
-            file_name=file_name,
-            data_list=data,
+    job_id_prefix = f"cymbal_pets_{first_day:%Y%m%d}_{last_day:%Y%m%d}_{uuid.uuid4().hex[:8]}_"
+
+    def record_loading(staged: dict):
+        loading = {
+            "job_id_prefix": job_id_prefix,
+            "output_format": output_format,
+            "tables": staged if sink.durable_staging else dict.fromkeys(staged),
+        }
+        sink.write_manifest(DataHandling.build_manifest(ids, last_day, loading=loading))
+
+    with telemetry.stage("export") as stage:
+        stage.update(
+            telemetry.record_exports(
+                export_tables(
+                    data_list=data_list,
+                    sink=sink,
+                    output_format=output_format,
+                    max_workers=config.export_workers,
+                    object_prefix=f"incremental/{first_day:%Y%m%d}-{last_day:%Y%m%d}/",
+                    write_disposition=WRITE_APPEND,
+                    job_id_prefix=job_id_prefix,
+                    before_load=record_loading,
+                    reference={
+                        "customers": customers,
+                        "stores": stores,
+                        "suppliers": suppliers,
+                        "products": products,
+                        "distribution_centers": distribution_centers,
+                    },
+                )
+            )
         )
-        DataHandling.load_gcs_to_bq(
-            data_name=name,
-            source_bucket=BUCKET_NAME,
-            dataset_id=DATASET_ID,
+    sink.write_manifest(
+        DataHandling.build_manifest(ids, last_order_date=last_day),
+    )
+    print("Cymbal Pets Dataset incremental generation successfully completed!")
+    return telemetry.summary()
+
+
+def resume_loads(sink: Sink, loading: dict):
+    """Finishes the loads of an incremental run that failed after staging.
+
+    The manifest already covers that run's days, so they are not generated
+    again. Its staged tables are loaded with the same job IDs, which skips
+    those loaded before the failure.
+    """
+    if not sink.durable_staging:
+        raise RuntimeError(
+            f"The loads with job ID prefix {loading['job_id_prefix']} may not have finished, "
+            f"and {type(sink).__name__} keeps no staged copy to retry them from. Check the "
+            "tables, then remove 'loading' from the manifest."
         )
-    print("Cymbal Pets Dataset generation successfully completed!")
+    print(f"Resuming the loads with job ID prefix {loading['job_id_prefix']}")
+    load_jobs = {
+        name: sink.load(
+            name,
+            staged,
+            output_format=loading["output_format"],
+            write_disposition=WRITE_APPEND,
+            job_id=loading["job_id_prefix"] + name,
+        )
+        for name, staged in loading["tables"].items()
+    }
+    for name, load_job in load_jobs.items():
+        load_job.result()
+        DataHandling.report_load(name, load_job)
 
 
 # main(num_of_customers=NUM_OF_CUSTOMERS, daily_orders=DAILY_ORDERS)
 
 
+@dataclass
+class Config:
+    """Run settings, read from the environment when a run starts."""
+
+    num_of_customers: int
+    daily_orders: int
+    generation_mode: str = GENERATION_MODE
+    sink: str = SINK
+    dataset_id: str = None
+    bucket_name: str = None
+    output_format: str = OUTPUT_FORMAT
+    text_mode: str = TEXT_MODE
+    reference_source: str = REFERENCE_SOURCE
+    local_data_dir: str = LOCAL_DATA_DIR
+    local_sink_dir: str = LOCAL_SINK_DIR
+    export_workers: int = EXPORT_WORKERS
+    export_queue_tables: int = EXPORT_QUEUE_TABLES
+    generation_processes: int = GENERATION_PROCESSES
+    generation_seed: int = GENERATION_SEED
+    order_chunk_size: int = ORDER_CHUNK_SIZE
+    spill_dir: str = SPILL_DIR
+    gzip_level: int = GZIP_LEVEL
+    profiler: str = PROFILER
+
+    @classmethod
+    def from_env(cls, environ: dict = None) -> "Config":
+        """Parses and validates every setting; unset or empty variables keep their defaults.
+
+        Raises:
+            ValueError: Listing every missing or invalid variable.
+        """
+        environ = os.environ if environ is None else environ
+        errors = []
+
+        def text(name, default=None, choices=None):
+            value = environ.get(name) or default
+            if choices is not None and value != default and value not in choices:
+                errors.append(f"{name}={value!r} is not one of {', '.join(choices)}")
+            return value
+
+        def integer(name, default=None, minimum=0, maximum=None, required=False):
+            value = environ.get(name)
+            if not value:
+                if required:
+                    errors.append(f"{name} is not set")
+                return default
+            try:
+                number = int(value)
+            except ValueError:
+                errors.append(f"{name}={value!r} is not an integer")
+                return default
+            if maximum is not None and not minimum <= number <= maximum:
+                errors.append(f"{name}={number} must be between {minimum} and {maximum}")
+            elif number < minimum:
+                errors.append(f"{name}={number} must be at least {minimum}")
+            return number
+
+        config = cls(
+            num_of_customers=integer("NUM_OF_CUSTOMERS", minimum=1, required=True),
+            daily_orders=integer("DAILY_ORDERS", required=True),
+            generation_mode=text("GENERATION_MODE", GENERATION_MODE, ("full", "incremental")),
+            sink=text("SINK", SINK, SINKS),
+            dataset_id=text("DATASET_ID"),
+            bucket_name=text("BUCKET_NAME"),
+            output_format=text("OUTPUT_FORMAT", OUTPUT_FORMAT, tuple(OUTPUT_FORMATS)),
+            text_mode=text("TEXT_MODE", TEXT_MODE, ("faker", "templates")),
+            reference_source=text("REFERENCE_SOURCE", REFERENCE_SOURCE, REFERENCE_SOURCES),
+            local_data_dir=text("LOCAL_DATA_DIR", LOCAL_DATA_DIR),
+            local_sink_dir=text("LOCAL_SINK_DIR", LOCAL_SINK_DIR),
+            export_workers=integer("EXPORT_WORKERS", EXPORT_WORKERS, minimum=1),
+            export_queue_tables=integer("EXPORT_QUEUE_TABLES", EXPORT_QUEUE_TABLES, minimum=1),
+            generation_processes=integer("GENERATION_PROCESSES", GENERATION_PROCESSES, minimum=1),
+            generation_seed=integer("GENERATION_SEED", GENERATION_SEED),
+            order_chunk_size=integer("ORDER_CHUNK_SIZE", ORDER_CHUNK_SIZE),
+            spill_dir=text("SPILL_DIR", SPILL_DIR),
+            gzip_level=integer("GZIP_LEVEL", GZIP_LEVEL, maximum=9),
+            profiler=text("PROFILER", PROFILER, PROFILERS),
+        )
+        if config.sink in ("gcs", "bigquery") and not config.dataset_id:
+            errors.append(f"DATASET_ID is not set, but SINK={config.sink} loads into it")
+        if config.sink == "gcs" and not config.bucket_name:
+            errors.append("BUCKET_NAME is not set, but SINK=gcs stages the tables in it")
+        if config.reference_source == "bucket" and not config.bucket_name:
+            errors.append("BUCKET_NAME is not set, but REFERENCE_SOURCE=bucket reads from it")
+        if config.reference_source == "local" and not config.local_data_dir:
+            errors.append("LOCAL_DATA_DIR is not set and no data/ folder was found")
+        if errors:
+            raise ValueError("Invalid configuration:\n  " + "\n  ".join(errors))
+        return config
+
+
 def hello_http(request):
-    main(num_of_customers=NUM_OF_CUSTOMERS, daily_orders=DAILY_ORDERS)
-    return "Function successfully finished"
+    config = Config.from_env()
+    with profiled(config.profiler):
+        summary = main(
+            num_of_customers=config.num_of_customers,
+            daily_orders=config.daily_orders,
+            mode=config.generation_mode,
+            sink=get_sink(config),
+            config=config,
+        )
+    return (
+        json.dumps(summary, default=DataHandling.serialize),
+        200,
+        {"Content-Type": "application/json"},
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    cache = sub.add_parser(
+        "build-location-cache", help="write data/locations_<iso3>.json"
+    )
+    cache.add_argument("country_iso3", nargs="?", default="USA")
+    cache.add_argument("--bucket", help="also upload it to this data bucket")
+    args = parser.parse_args()
+
+    if args.command == "build-location-cache":
+        build_location_cache(args.country_iso3, bucket_name=args.bucket)